@@ -36,7 +36,8 @@ def create() -> None:
             "pydantic (>=2.10.6,<3.0.0)",
             "python-dotenv (>=1.0.0,<2.0.0)",
             "requests (>=2.31.0,<3.0.0)",
-            "beautifulsoup4 (>=4.12.0,<5.0.0)",
+            "lxml (>=4.9.0,<7.0.0)",
+            "tenacity (>=8.2.0,<10.0.0)",
             "absl-py (>=2.2.1,<3.0.0)",
         ],
         extra_packages=["./privacy_agent"],
@@ -0,0 +1,27 @@
+"""
+Cached access to the environment configuration shared by the privacy agents.
+"""
+import os
+from functools import cache, lru_cache
+
+
+@cache
+def _load():
+    """Loads .env from the project root or current working directory, once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_api_key():
+    """
+    Returns the Gemini API key, read from the environment exactly once.
+
+    GOOGLE_API_KEY takes precedence; GEMINI_API_KEY is supported for backward
+    compatibility. Returns None if neither is set. The first call also loads
+    the .env file.
+    """
+    _load()
+    return os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+
@@ -1,102 +1,174 @@
 # /Users/cvsubramanian/CascadeProjects/privacyagent/privacy_agent/agent.py
 """Defines the root agent for the Privacy Assessment application, including the main agent class."""
 
+import asyncio
+import functools
+import logging
 import sys
 from google.adk.agents import SequentialAgent
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+from .llm.client import configure_genai
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Configure the genai library globally
-google_api_key = os.getenv("GOOGLE_API_KEY")
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-api_key_to_use = google_api_key or gemini_api_key
+logger.debug("Executing privacy_agent/agent.py START")
 
-if api_key_to_use:
-    print(f"DEBUG: privacy_agent/agent.py - Configuring genai with API key")
-    genai.configure(api_key=api_key_to_use)
-else:
-    print("ERROR: No API key found in environment variables (checked both GOOGLE_API_KEY and GEMINI_API_KEY).")
 
-print("DEBUG: Executing privacy_agent/agent.py START")
+def _cached_import(module_path, class_name):
+    """
+    Returns `class_name` from `module_path`, importing the module only if it is
+    not already in sys.modules (modelled on Django's cached_import).
+    """
+    module = sys.modules.get(module_path)
+    if module is None:
+        from importlib import import_module
+        module = import_module(module_path)
+    return getattr(module, class_name)
+
+
+@functools.cache
+def _build_sub_agents():
+    """
+    Builds the five sub-agents once per process, in pipeline order.
+
+    The returned instances are prototypes and are never attached to a parent;
+    PrivacyAssessmentAgent copies them so repeated constructions do not re-create
+    the Gemini clients.
+    """
+    # Import the sub-agents here rather than at module level so that importing
+    # this module (e.g. for tests that mock the sub-agents) does not load all
+    # five LLM agent modules. Repeated constructions hit sys.modules directly.
+    # An ImportError here propagates unchanged to the caller.
+    PolicyFetcherAgent = _cached_import("privacy_agent.agents.policy_fetcher_agent", "PolicyFetcherAgent")
+    RegulationUnderstandingAgent = _cached_import("privacy_agent.agents.regulation_understanding_agent", "RegulationUnderstandingAgent")
+    PolicyAnalyzerAgent = _cached_import("privacy_agent.agents.policy_analyzer_agent", "PolicyAnalyzerAgent")
+    ComplianceAssessorAgent = _cached_import("privacy_agent.agents.compliance_assessor_agent", "ComplianceAssessorAgent")
+    ReportGeneratorAgent = _cached_import("privacy_agent.agents.report_generator_agent", "ReportGeneratorAgent")
+    logger.debug("_build_sub_agents - Successfully imported all sub-agent classes.")
+
+    return (
+        PolicyFetcherAgent(name="PolicyFetcher"),
+        RegulationUnderstandingAgent(name="RegulationUnderstander"),
+        PolicyAnalyzerAgent(name="PolicyAnalyzer"),
+        ComplianceAssessorAgent(name="ComplianceAssessor"),
+        ReportGeneratorAgent(name="ReportGenerator"),
+    )
 
-# Import the sub-agents - these paths are relative to this file's location
-# (privacy_agent/agent.py), so we need to go into the 'agents' subdirectory.
-try:
-    from .agents.policy_fetcher_agent import PolicyFetcherAgent
-    from .agents.regulation_understanding_agent import RegulationUnderstandingAgent
-    from .agents.policy_analyzer_agent import PolicyAnalyzerAgent
-    from .agents.compliance_assessor_agent import ComplianceAssessorAgent
-    from .agents.report_generator_agent import ReportGeneratorAgent
-    print("DEBUG: privacy_agent/agent.py - Successfully imported all sub-agent classes.")
-except ImportError as e:
-    print(f"DEBUG: privacy_agent/agent.py - ImportError while importing sub-agents: {e}")
-    # Define placeholders if import fails, so class definition doesn't break immediately
-    PolicyFetcherAgent = RegulationUnderstandingAgent = PolicyAnalyzerAgent = ComplianceAssessorAgent = ReportGeneratorAgent = None
 
 class PrivacyAssessmentAgent(SequentialAgent):
     """
     A sequential agent that orchestrates various sub-agents to perform a
     privacy assessment based on a company's URL and a specific regulation.
     """
+    # Fields live in pydantic's own __dict__ slot; add no per-instance slots of our own
+    __slots__ = ()
+
     def __init__(self):
-        print("DEBUG: PrivacyAssessmentAgent __init__ STARTING.")
-        if None in [PolicyFetcherAgent, RegulationUnderstandingAgent, PolicyAnalyzerAgent, ComplianceAssessorAgent, ReportGeneratorAgent]:
-            print("DEBUG: PrivacyAssessmentAgent __init__ - One or more sub-agent classes are None due to import failure.")
-            # Handle error appropriately, e.g., raise an exception or set a faulty state
-            raise ImportError("Failed to import one or more sub-agent classes for PrivacyAssessmentAgent.")
-
-        # Instantiate sub-agents
-        policy_fetcher = PolicyFetcherAgent(name="PolicyFetcher")
-        regulation_understander = RegulationUnderstandingAgent(name="RegulationUnderstander")
-        policy_analyzer = PolicyAnalyzerAgent(name="PolicyAnalyzer")
-        compliance_assessor = ComplianceAssessorAgent(name="ComplianceAssessor")
-        report_generator = ReportGeneratorAgent(name="ReportGenerator")
-        print("DEBUG: PrivacyAssessmentAgent __init__ - Sub-agents instantiated.")
-
-        sub_agents = [
-            policy_fetcher,
-            regulation_understander,
-            policy_analyzer,
-            compliance_assessor,
-            report_generator,
-        ]
+        logger.debug("PrivacyAssessmentAgent __init__ STARTING.")
+        # Configure the genai library globally; only the first call does any work
+        if configure_genai():
+            logger.debug("PrivacyAssessmentAgent __init__ - genai configured with API key")
+        else:
+            logger.error("No API key found in environment variables (checked both GOOGLE_API_KEY and GEMINI_API_KEY).")
+        # ADK allows an agent only one parent, so each orchestrator gets shallow
+        # copies of the shared prototypes (reusing their LLM clients).
+        sub_agents = [prototype.model_copy() for prototype in _build_sub_agents()]
+        logger.debug("PrivacyAssessmentAgent __init__ - Sub-agents instantiated.")
 
         super().__init__(
             name="PrivacyAssessmentOrchestrator", # You can keep this or use 'PrivacyAssessmentAgent'
             description="Orchestrates the privacy assessment process by fetching policies, understanding regulations, analyzing policies, assessing compliance, and generating a report.",
             sub_agents=sub_agents,
         )
-        print("DEBUG: PrivacyAssessmentAgent __init__ FINISHED (super called).")
+        logger.debug("PrivacyAssessmentAgent __init__ FINISHED (super called).")
+
+    async def analyze_url(self, url: str, principles: list[str]):
+        """
+        Fetches the policy at `url` and analyzes it against each principle.
+
+        The principle explanations do not depend on the policy, so they are
+        requested before the fetch starts and are normally ready (or served from
+        the explanation cache) by the time the policy text is available.
+
+        Args:
+            url: The URL of the privacy policy.
+            principles: The names of the privacy principles to assess.
+
+        Returns:
+            A list of AssessmentResult (one per principle, without a compliance
+            assessment yet), or {"error": ...} if the policy could not be fetched.
+            A failed explanation leaves principle_explanation empty and is kept in
+            additional_details["explanation_error"].
+        """
+        from .data_structures import AssessmentResult, PolicyAnalysisResult
+
+        fetcher = self.find_sub_agent("PolicyFetcher")
+        regulation = self.find_sub_agent("RegulationUnderstander")
+        analyzer = self.find_sub_agent("PolicyAnalyzer")
+
+        # Start the explanations first so they overlap with the fetch and parse
+        explanations_task = asyncio.ensure_future(
+            asyncio.gather(*(regulation.ainvoke(principle) for principle in principles))
+        )
+        try:
+            fetched = (await fetcher.ainvoke([url]))[0]
+            if "error" in fetched:
+                return fetched
+            explanations = await explanations_task
+        finally:
+            # No-op once the explanations are in; otherwise stops the outstanding requests
+            explanations_task.cancel()
+        policy_text = fetched["extracted_text"]
+
+        # A failed explanation is an "Error: ..." string; it must not be used as
+        # ranking text for the analysis or reported as the principle's explanation
+        explanation_errors = [e if e.startswith("Error:") else None for e in explanations]
+        explanations = ["" if error else e for e, error in zip(explanations, explanation_errors)]
+        analyses = await analyzer.ainvoke_many(policy_text, principles, principle_explanations=explanations)
+
+        results = []
+        for principle, explanation, explanation_error, analysis in zip(
+            principles, explanations, explanation_errors, analyses
+        ):
+            details = {"explanation_error": explanation_error} if explanation_error else {}
+            if "error" in analysis:
+                details["analysis_error"] = analysis["error"]
+                results.append(AssessmentResult(
+                    principle_name=principle,
+                    principle_explanation=explanation,
+                    additional_details=details,
+                ))
+            else:
+                results.append(AssessmentResult(
+                    principle_name=principle,
+                    principle_explanation=explanation,
+                    policy_analysis=PolicyAnalysisResult(**analysis),
+                    additional_details=details,
+                ))
+        return results
 
 # --- Instantiation and root_agent assignment ---
 root_agent = None # Initialize
 try:
     # Instantiate the main agent
     _pa_instance = PrivacyAssessmentAgent()
-    print(f"DEBUG: privacy_agent/agent.py - Successfully instantiated PrivacyAssessmentAgent: {_pa_instance}")
+    logger.debug("Successfully instantiated PrivacyAssessmentAgent: %s", _pa_instance)
 
     # Expose the instance as root_agent, as expected by ADK
     root_agent = _pa_instance
-    print(f"DEBUG: privacy_agent/agent.py - root_agent is now assigned: {root_agent}")
+    logger.debug("root_agent is now assigned: %s", root_agent)
 
 except ImportError as e: # Catch import errors from sub-agent loading too
-    print(f"DEBUG: privacy_agent/agent.py - ImportError during PrivacyAssessmentAgent setup: {e}")
-    print(f"DEBUG: Python Path: {sys.path}")
+    logger.debug("ImportError during PrivacyAssessmentAgent setup: %s", e)
+    logger.debug("Python Path: %s", sys.path)
     root_agent = f"ERROR_IMPORT_IN_AGENT_PY: {e}"
 except Exception as e:
-    print(f"DEBUG: privacy_agent/agent.py - EXCEPTION during PrivacyAssessmentAgent instantiation or assignment:")
-    import traceback
-    print(traceback.format_exc())
+    logger.exception("EXCEPTION during PrivacyAssessmentAgent instantiation or assignment")
     root_agent = f"ERROR_INSTANTIATION_IN_AGENT_PY: {e}"
 
 if root_agent is None or (isinstance(root_agent, str) and "ERROR" in root_agent):
-    print(f"DEBUG: privacy_agent/agent.py - CRITICAL: root_agent was NOT DEFINED properly or is an error. Value: {root_agent}")
+    logger.critical("root_agent was NOT DEFINED properly or is an error. Value: %s", root_agent)
     if root_agent is None: # Ensure it's at least an error string if it somehow ended up as None
         root_agent = "ERROR_AGENT_PY_ROOT_AGENT_WAS_NONE"
 
 
-print("DEBUG: Executing privacy_agent/agent.py FINISH")
+logger.debug("Executing privacy_agent/agent.py FINISH")
@@ -1,6 +1,23 @@
 # /Users/cvsubramanian/CascadeProjects/privacyagent/privacy_agent/agents/__init__.py
-from .policy_fetcher_agent import PolicyFetcherAgent
-from .regulation_understanding_agent import RegulationUnderstandingAgent
-from .policy_analyzer_agent import PolicyAnalyzerAgent
-from .compliance_assessor_agent import ComplianceAssessorAgent
-from .report_generator_agent import ReportGeneratorAgent
+# Sub-agent classes are resolved on first access (PEP 562) so that importing a
+# single agent module does not load the other four.
+from importlib import import_module
+
+_AGENT_MODULES = {
+    "PolicyFetcherAgent": ".policy_fetcher_agent",
+    "RegulationUnderstandingAgent": ".regulation_understanding_agent",
+    "PolicyAnalyzerAgent": ".policy_analyzer_agent",
+    "ComplianceAssessorAgent": ".compliance_assessor_agent",
+    "ReportGeneratorAgent": ".report_generator_agent",
+}
+
+__all__ = list(_AGENT_MODULES)
+
+
+def __getattr__(name):
+    module_path = _AGENT_MODULES.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_path, __name__), name)
+    globals()[name] = value
+    return value
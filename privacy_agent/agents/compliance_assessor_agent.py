@@ -1,17 +1,26 @@
 """
 ComplianceAssessorAgent: Assesses privacy policy compliance with a specific principle.
 """
+import logging
+import re
 import sys
-import os
 import typing
+from collections import OrderedDict
+from itertools import islice
 from typing import ClassVar
 
-from dotenv import load_dotenv
-load_dotenv() # Load .env from the project root or current working directory
-
 from google.adk.agents import Agent
-import google.generativeai as genai
-from google.adk.models.google_llm import Gemini
+from pydantic import PrivateAttr
+from privacy_agent._env import get_api_key
+from privacy_agent.llm.client import get_gemini, get_generative_model
+from privacy_agent.llm.retry import call_llm
+
+logger = logging.getLogger(__name__)
+
+# A bullet point in LLM-generated suggestion lists ("* " or "- ")
+_BULLET = re.compile(r"[*-] ")
+# A header line such as "Suggestions:"
+_HEADER = re.compile(r".*:\s*$")
 
 class ComplianceAssessorAgent(Agent):
     """
@@ -20,6 +29,9 @@ class ComplianceAssessorAgent(Agent):
     of the policy.
     """
 
+    # Fields live in pydantic's own __dict__ slot; add no per-instance slots of our own
+    __slots__ = ()
+
     DEFAULT_INSTRUCTION: ClassVar[str] = (
         "You are an AI assistant specialized in privacy compliance assessment. "
         "Your task is to assess how well a privacy policy complies with a specific privacy principle. "
@@ -34,6 +46,37 @@ class ComplianceAssessorAgent(Agent):
         "Structure your output clearly under these three headings."
     )
 
+    # Analyses that leave nothing for the LLM to judge
+    _TRIVIAL_ANALYSES: ClassVar[frozenset] = frozenset(("not addressed", "not addressed.", "n/a"))
+    _MIN_ANALYSIS_LENGTH: ClassVar[int] = 16
+    _NOT_ADDRESSED_ASSESSMENT: ClassVar[str] = (
+        "1. Compliance Level: Not Addressed\n"
+        "2. Justification: No relevant content found in policy.\n"
+        "3. Suggestions for Improvement: Add an explicit section covering this principle."
+    )
+
+    # Upper bound on memoized assessments kept per agent (least recently used are evicted)
+    _RESULT_CACHE_SIZE: ClassVar[int] = 256
+
+    # (principle_name, policy_excerpt, analysis) -> assessment
+    _results: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+
+    # google.generativeai client the agent calls with text prompts; self.model is the
+    # ADK Gemini used by the ADK runtime, which takes LlmRequest objects instead
+    _client: typing.Any = PrivateAttr(default=None)
+
+    # Per-call prompt; filled with (principle_name, principle_name, excerpt_block, analysis)
+    _PROMPT_TMPL: ClassVar[str] = (
+        "Assess how well a privacy policy complies with the privacy principle of '%s'.\n\n"
+        "PRINCIPLE: %s\n\n"
+        "%s"
+        "ANALYSIS:\n%s\n\n"
+        "Provide a compliance assessment with the following structure:\n"
+        "1. Compliance Level: (High, Medium, Low, or Not Addressed)\n"
+        "2. Justification: (Explain your reasoning for the compliance level)\n"
+        "3. Suggestions for Improvement: (Provide actionable suggestions if applicable)"
+    )
+
     def __init__(self, model_name: str = "gemini-2.0-flash", name: str = "ComplianceAssessor"):
         """
         Initialize the ComplianceAssessorAgent.
@@ -42,21 +85,15 @@ class ComplianceAssessorAgent(Agent):
             model_name: The name of the LLM model to use.
             name: The name of the agent.
         """
-        print(f"DEBUG: {name} - Initializing with model {model_name}")
-        
-        # Try both API key environment variables
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        api_key_to_use = google_api_key or gemini_api_key
+        logger.debug("%s - Initializing with model %s", name, model_name)
         
-        llm_instance = None
-        if api_key_to_use:
-            key_source = "GOOGLE_API_KEY" if google_api_key else "GEMINI_API_KEY"
-            print(f"DEBUG: {name} - API key found from {key_source}. Creating Gemini instance with this API key.")
-            llm_instance = Gemini(model_name=model_name, api_key=api_key_to_use)
+        # GOOGLE_API_KEY or GEMINI_API_KEY, read once per process
+        if get_api_key():
+            logger.debug("%s - API key found. Using shared Gemini instance with this API key.", name)
         else:
-            print(f"ERROR: {name} - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.")
-            llm_instance = Gemini(model_name=model_name)
+            logger.error("%s - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.", name)
+        # One Gemini instance per model name, shared by all sub-agents
+        llm_instance = get_gemini(model_name)
         
         super().__init__(
             model=llm_instance,
@@ -64,7 +101,8 @@ class ComplianceAssessorAgent(Agent):
             description="Assesses privacy policy compliance with a specific principle.",
             instruction=self.DEFAULT_INSTRUCTION,
         )
-        print(f"DEBUG: {name} - Initialization complete")
+        self._client = get_generative_model(model_name)
+        logger.debug("%s - Initialization complete", name)
 
     def invoke(self, input_request: str, context=None):
         """
@@ -77,7 +115,7 @@ class ComplianceAssessorAgent(Agent):
         Returns:
             A string assessment of compliance level, justification, and suggestions.
         """
-        print(f"DEBUG: {self.name} - invoke() called with input: '{input_request}'")
+        logger.debug("%s - invoke() called with input: '%s'", self.name, input_request)
         
         # Extract required inputs from context
         principle_name = None
@@ -91,55 +129,57 @@ class ComplianceAssessorAgent(Agent):
             
         if not principle_name or not analysis:
             error_msg = "Missing required inputs: principle_name and analysis must be provided in context."
-            print(f"ERROR: {self.name} - {error_msg}")
+            logger.error("%s - %s", self.name, error_msg)
             return f"Error: {error_msg}"
             
-        print(f"DEBUG: {self.name} - Assessing compliance for principle: '{principle_name}'")
+        logger.debug("%s - Assessing compliance for principle: '%s'", self.name, principle_name)
+        
+        # The outcome of an empty or "not addressed" analysis is known without asking the LLM
+        low = analysis.strip().lower()
+        if low in self._TRIVIAL_ANALYSES or len(low) < self._MIN_ANALYSIS_LENGTH:
+            logger.debug("%s - Trivial analysis, skipping LLM call", self.name)
+            return self._NOT_ADDRESSED_ASSESSMENT
+        
+        key = (principle_name, policy_excerpt, analysis)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            logger.debug("%s - Returning memoized assessment", self.name)
+            return cached
         
         try:
-            # Ensure GOOGLE_API_KEY is set, otherwise GenerativeModel() will fail
-            if not os.getenv("GOOGLE_API_KEY"):
-                 return {"error": "GOOGLE_API_KEY not set."}
-            
-            # Construct the prompt
-            prompt = (
-                f"Assess how well a privacy policy complies with the privacy principle of '{principle_name}'.\n\n"
-                f"PRINCIPLE: {principle_name}\n\n"
-            )
-            
-            if policy_excerpt:
-                prompt += f"POLICY EXCERPT:\n{policy_excerpt}\n\n"
-                
-            prompt += (
-                f"ANALYSIS:\n{analysis}\n\n"
-                f"Provide a compliance assessment with the following structure:\n"
-                f"1. Compliance Level: (High, Medium, Low, or Not Addressed)\n"
-                f"2. Justification: (Explain your reasoning for the compliance level)\n"
-                f"3. Suggestions for Improvement: (Provide actionable suggestions if applicable)"
-            )
+            # Construct the prompt in a single formatting pass
+            excerpt_block = f"POLICY EXCERPT:\n{policy_excerpt}\n\n" if policy_excerpt else ""
+            prompt = self._PROMPT_TMPL % (principle_name, principle_name, excerpt_block, analysis)
             
             # Use the model to generate a response
-            response = self.model.generate_content(prompt)
+            response = call_llm(self._client, prompt)
             
-            if response and hasattr(response, 'text'):
+            try:
                 assessment = response.text.strip()
-                print(f"DEBUG: {self.name} - Generated assessment (first 100 chars): '{assessment[:100]}...'")
-                return assessment
-            else:
+            except AttributeError:
                 error_msg = "Failed to generate assessment: empty or invalid response from LLM."
-                print(f"ERROR: {self.name} - {error_msg}")
+                logger.error("%s - %s", self.name, error_msg)
                 return f"Error: {error_msg}"
+            logger.debug("%s - Generated assessment (first 100 chars): '%.100s...'", self.name, assessment)
+            self._results[key] = assessment
+            if len(self._results) > self._RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return assessment
                 
         except Exception as e:
             error_msg = f"Exception during LLM call: {str(e)}"
-            print(f"ERROR: {self.name} - {error_msg}")
+            logger.error("%s - %s", self.name, error_msg)
             return f"Error: {error_msg}"
 
-    def _parse_suggestions(self, suggestions_text):
+    @staticmethod
+    def _parse_suggestions(suggestions_text):
         """
         Parse suggestions from the LLM output into a list of individual suggestions.
         
         This handles various formats that the LLM might use to present suggestions.
+        Each line is stripped and classified exactly once, and the parts of a
+        suggestion are only joined when it is complete.
         
         Args:
             suggestions_text: The raw text containing suggestions from the LLM.
@@ -155,75 +195,56 @@ class ComplianceAssessorAgent(Agent):
         # Split by common bullet point markers
         lines = suggestions_text.split('\n')
         
-        current_main_suggestion_parts = []
+        current_parts = []
         base_indent = 0
-        first_bullet_processed_for_current_header = False
+        seen_bullet = False
+        start = 0
         
         # Process the first line if it doesn't start with a bullet
         # (it might be a header or part of a suggestion)
-        content_lines = lines
-        if content_lines and not (content_lines[0].lstrip().startswith("* ") or 
-                                content_lines[0].lstrip().startswith("- ")):
-            first_line_content = content_lines[0].strip()
+        if _BULLET.match(lines[0].lstrip()) is None:
+            first_line_content = lines[0].strip()
             # If it's not a header (like "Suggestions:"), treat it as part of the first suggestion
-            if not first_line_content.lower().endswith(":"):
-                if first_line_content:
-                    current_main_suggestion_parts.append(first_line_content)
-                content_lines = content_lines[1:] # Processed, so remove
+            if _HEADER.match(first_line_content) is None and first_line_content:
+                current_parts.append(first_line_content)
+            start = 1 # Processed (or skipped as a header), so skip it below
 
-            for raw_line in content_lines:
-                line_lstripped = raw_line.lstrip()
-                current_indent = len(raw_line) - len(line_lstripped)
+        for raw_line in islice(lines, start, None):
+            stripped = raw_line.lstrip()
 
-                is_bullet = line_lstripped.startswith("* ") or line_lstripped.startswith("- ")
-
-                if is_bullet:
-                    bullet_content = line_lstripped[2:].strip()
-                    if not first_bullet_processed_for_current_header or current_indent <= base_indent:
-                        # This is a new top-level bullet
-                        if current_main_suggestion_parts: # Save previous main suggestion
-                            suggestions_list.append(" ".join(current_main_suggestion_parts).strip())
-                        current_main_suggestion_parts = [bullet_content]
-                        base_indent = current_indent
-                        first_bullet_processed_for_current_header = True
-                    else: # This is a sub-bullet (indented further than base_indent)
-                        if current_main_suggestion_parts:
-                            # Append to current main suggestion, maybe marking it as a sub-point
-                            current_main_suggestion_parts.append(f"(sub-point: {bullet_content})")
-                        else:
-                            # Orphaned sub-bullet, treat as a new main bullet for robustness
-                            current_main_suggestion_parts = [bullet_content]
-                            base_indent = current_indent
-                else:
-                    # This is a continuation of the previous bullet point or a standalone paragraph
-                    content = line_lstripped.strip()
-                    if content and current_main_suggestion_parts:
-                        current_main_suggestion_parts.append(content)
-                    elif content:
-                        # Standalone paragraph without a bullet, treat as a new suggestion
-                        if current_main_suggestion_parts:
-                            suggestions_list.append(" ".join(current_main_suggestion_parts).strip())
-                        current_main_suggestion_parts = [content]
+            if _BULLET.match(stripped) is not None:
+                indent = len(raw_line) - len(stripped)
+                bullet_content = stripped[2:].strip()
+                if not seen_bullet or indent <= base_indent:
+                    # This is a new top-level bullet
+                    if current_parts: # Save previous main suggestion
+                        suggestions_list.append(" ".join(current_parts).strip())
+                    current_parts = [bullet_content]
+                    base_indent = indent
+                    seen_bullet = True
+                else: # This is a sub-bullet (indented further than base_indent)
+                    current_parts.append(f"(sub-point: {bullet_content})")
+            else:
+                # This is a continuation of the previous bullet point or a standalone paragraph
+                content = stripped.rstrip()
+                if content:
+                    current_parts.append(content)
         
         # Don't forget to add the last suggestion if there is one
-        if current_main_suggestion_parts:
-            suggestions_list.append(" ".join(current_main_suggestion_parts).strip())
+        if current_parts:
+            suggestions_list.append(" ".join(current_parts).strip())
             
-        # If we didn't successfully parse any bullets, fall back to treating each line as a suggestion
-        if not suggestions_list and lines:
-            for line in lines:
-                content = line.strip()
-                if content:
-                    suggestions_list.append(content)
+        # Nothing but a header (or blank lines) was found: return the non-empty lines as-is
+        if not suggestions_list:
+            suggestions_list = [content for content in (line.strip() for line in lines) if content]
                     
         return suggestions_list
 
-
 # For testing directly
 if __name__ == "__main__":
     print("--- Testing ComplianceAssessorAgent --- (Requires GOOGLE_API_KEY)")
     
-    if not os.getenv("GOOGLE_API_KEY"):
+    if not get_api_key():
         print("\nWARNING: GOOGLE_API_KEY environment variable not found.")
         print("LLM calls will fail. Set this in your environment or .env file.")
         exit(1)
@@ -1,16 +1,71 @@
 """
 PolicyAnalyzerAgent: Analyzes privacy policy text against a specific privacy principle.
 """
-import os
+import asyncio
+import json
+import logging
+import re
 import typing
 from typing import ClassVar
-from dotenv import load_dotenv
-
-load_dotenv() # Load .env from the project root or current working directory
 
 from google.adk.agents import Agent
-import google.generativeai as genai
-from google.adk.models.google_llm import Gemini
+from pydantic import PrivateAttr
+from privacy_agent._env import get_api_key
+from privacy_agent.llm.client import get_gemini, get_generative_model
+from privacy_agent.llm.retry import acall_llm, call_llm
+from privacy_agent.utils.relevance import select_relevant_sections
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent Gemini requests issued by ainvoke_many; sized for
+# the default per-minute quota (roughly 500 requests per minute)
+MAX_CONCURRENCY = 8
+
+# Number of principles sent in a single invoke_batch request; larger batches
+# save little more input while making each response longer and more fragile
+BATCH_SIZE = 6
+
+# Characters ignored when matching a principle name returned in a batch to a requested one
+_NAME_PUNCTUATION = re.compile(r"[^a-z0-9]+")
+
+# Response schema for one principle; the fields match PolicyAnalysisResult
+_EXCERPTS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "excerpt": {"type": "string"},
+            "location_context": {"type": "string"},
+        },
+        "required": ["excerpt"],
+    },
+}
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "relevant_excerpts": _EXCERPTS_SCHEMA,
+    },
+    "required": ["summary", "relevant_excerpts"],
+}
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "analyses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "principle": {"type": "string"},
+                    "summary": {"type": "string"},
+                    "relevant_excerpts": _EXCERPTS_SCHEMA,
+                },
+                "required": ["principle", "summary", "relevant_excerpts"],
+            },
+        },
+    },
+    "required": ["analyses"],
+}
 
 class PolicyAnalyzerAgent(Agent):
     """
@@ -18,18 +73,20 @@ class PolicyAnalyzerAgent(Agent):
     a specific privacy principle or regulation, extracting relevant excerpts.
     """
 
+    # google.generativeai client the agent calls with text prompts; self.model is the
+    # ADK Gemini used by the ADK runtime, which takes LlmRequest objects instead
+    _client: typing.Any = PrivateAttr(default=None)
+
     DEFAULT_INSTRUCTION: ClassVar[str] = (
         "You are an AI assistant specialized in privacy policy analysis. "
         "Your task is to analyze the provided privacy policy text to determine if and how it addresses "
         "the given privacy principle or regulation. Identify specific clauses or statements in the policy "
         "that are relevant to the principle. Provide a concise analysis and quote the most relevant "
         "excerpts from the policy text. If the policy does not address the principle, state that clearly. "
-        "Structure your output as follows:\n"
-        "Analysis: [Your analysis of how the policy addresses the principle]\n"
-        "Relevant Excerpts:\n"
-        "- [Quote 1]\n"
-        "- [Quote 2 (if applicable)]\n"
-        "If not addressed: Policy does not appear to address this principle."
+        "Respond with JSON containing:\n"
+        "summary: [Your analysis of how the policy addresses the principle]\n"
+        "relevant_excerpts: [{excerpt: quoted policy text, location_context: section or heading it appears under}]\n"
+        "If not addressed, the summary is 'Policy does not appear to address this principle.' and there are no excerpts."
     )
 
     def __init__(self, model_name: str = "gemini-2.0-flash", name: str = "PolicyAnalyzer"):
@@ -40,21 +97,15 @@ class PolicyAnalyzerAgent(Agent):
             model_name: The name of the LLM model to use.
             name: The name of the agent.
         """
-        print(f"DEBUG: {name} - Initializing with model {model_name}")
-        
-        # Try both API key environment variables
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        api_key_to_use = google_api_key or gemini_api_key
+        logger.debug("%s - Initializing with model %s", name, model_name)
         
-        llm_instance = None
-        if api_key_to_use:
-            key_source = "GOOGLE_API_KEY" if google_api_key else "GEMINI_API_KEY"
-            print(f"DEBUG: {name} - API key found from {key_source}. Creating Gemini instance with this API key.")
-            llm_instance = Gemini(model_name=model_name, api_key=api_key_to_use)
+        # GOOGLE_API_KEY or GEMINI_API_KEY, read once per process
+        if get_api_key():
+            logger.debug("%s - API key found. Using shared Gemini instance with this API key.", name)
         else:
-            print(f"ERROR: {name} - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.")
-            llm_instance = Gemini(model_name=model_name)
+            logger.error("%s - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.", name)
+        # One Gemini instance per model name, shared by all sub-agents
+        llm_instance = get_gemini(model_name)
         
         super().__init__(
             model=llm_instance,
@@ -62,7 +113,8 @@ class PolicyAnalyzerAgent(Agent):
             description="Analyzes privacy policy text against a specific privacy principle.",
             instruction=self.DEFAULT_INSTRUCTION,
         )
-        print(f"DEBUG: {name} - Initialization complete")
+        self._client = get_generative_model(model_name)
+        logger.debug("%s - Initialization complete", name)
 
     def invoke(self, input_request: str, context=None):
         """
@@ -70,65 +122,307 @@ class PolicyAnalyzerAgent(Agent):
         
         Args:
             input_request: The user's request, typically asking for analysis of a policy.
-            context: The invocation context, which should contain the policy_text and principle_name.
+            context: The invocation context, which should contain the policy_text and principle_name,
+                     and may contain a principle_explanation used to pick the relevant policy sections.
             
         Returns:
-            A string analysis of how the policy addresses the principle.
+            A dict with the analysis "summary" and its "relevant_excerpts"
+            (a list of {"excerpt", "location_context"} dicts), or {"error": ...}.
         """
-        print(f"DEBUG: {self.name} - invoke() called with input: '{input_request}'")
+        logger.debug("%s - invoke() called with input: '%s'", self.name, input_request)
         
         # Extract policy_text and principle_name from context
         policy_text = None
         principle_name = None
+        principle_explanation = ""
         
         if context and hasattr(context, 'state'):
             policy_text = context.state.get('policy_text')
             principle_name = context.state.get('principle_name')
+            principle_explanation = context.state.get('principle_explanation') or ""
             
         if not policy_text or not principle_name:
             error_msg = "Missing required inputs: policy_text and principle_name must be provided in context."
-            print(f"ERROR: {self.name} - {error_msg}")
-            return f"Error: {error_msg}"
+            logger.error("%s - %s", self.name, error_msg)
+            return {"error": error_msg}
             
-        print(f"DEBUG: {self.name} - Analyzing policy for principle: '{principle_name}'")
-        print(f"DEBUG: {self.name} - Policy text length: {len(policy_text)} characters")
+        logger.debug("%s - Analyzing policy for principle: '%s'", self.name, principle_name)
+        logger.debug("%s - Policy text length: %d characters", self.name, len(policy_text))
         
         try:
-            # Ensure GOOGLE_API_KEY is set, otherwise GenerativeModel() will fail
-            if not os.getenv("GOOGLE_API_KEY"):
-                 return {"error": "GOOGLE_API_KEY not set."}
-            
-            # Construct the prompt
-            prompt = (
-                f"Analyze the following privacy policy text to determine how it addresses the privacy principle of '{principle_name}'.\n\n"
-                f"PRIVACY POLICY TEXT:\n{policy_text}\n\n"
-                f"Provide your analysis of how the policy addresses the principle of '{principle_name}'. "
-                f"Include relevant excerpts from the policy text. If the policy does not address this principle, state that clearly."
+            # Use the model to generate a response
+            response = call_llm(
+                self._client,
+                self._build_prompt(policy_text, principle_name, principle_explanation),
+                generation_config={"response_mime_type": "application/json", "response_schema": ANALYSIS_SCHEMA},
             )
+            return self._analysis_from_response(response)
+                
+        except Exception as e:
+            error_msg = f"Exception during LLM call: {str(e)}"
+            logger.error("%s - %s", self.name, error_msg)
+            return {"error": error_msg}
+
+    async def ainvoke(self, policy_text: str, principle_name: str, principle_explanation: str = ""):
+        """
+        Asynchronously analyze a privacy policy text against a specific privacy principle.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_name: The name of the privacy principle to analyze the policy against.
+            principle_explanation: Optional explanation of the principle, used to pick the relevant policy sections.
             
-            # Use the model to generate a response
-            response = self.model.generate_content(prompt)
+        Returns:
+            The same dict as invoke().
+        """
+        if not policy_text or not principle_name:
+            error_msg = "Missing required inputs: policy_text and principle_name must be provided."
+            logger.error("%s - %s", self.name, error_msg)
+            return {"error": error_msg}
             
-            if response and hasattr(response, 'text'):
-                analysis = response.text.strip()
-                print(f"DEBUG: {self.name} - Generated analysis (first 100 chars): '{analysis[:100]}...'")
-                return analysis
-            else:
-                error_msg = "Failed to generate analysis: empty or invalid response from LLM."
-                print(f"ERROR: {self.name} - {error_msg}")
-                return f"Error: {error_msg}"
-                
+        logger.debug("%s - Analyzing policy (async) for principle: '%s'", self.name, principle_name)
+        
+        try:
+            response = await acall_llm(
+                self._client,
+                self._build_prompt(policy_text, principle_name, principle_explanation),
+                generation_config={"response_mime_type": "application/json", "response_schema": ANALYSIS_SCHEMA},
+            )
+            return self._analysis_from_response(response)
         except Exception as e:
             error_msg = f"Exception during LLM call: {str(e)}"
-            print(f"ERROR: {self.name} - {error_msg}")
-            return f"Error: {error_msg}"
+            logger.error("%s - %s", self.name, error_msg)
+            return {"error": error_msg}
+
+    async def ainvoke_many(self, policy_text: str, principle_names, max_concurrency: int = MAX_CONCURRENCY,
+                           principle_explanations=None):
+        """
+        Analyze a privacy policy against several principles concurrently.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_names: The names of the privacy principles to analyze the policy against.
+            max_concurrency: The maximum number of LLM requests in flight at once.
+            principle_explanations: Optional explanations, one per principle name, used to
+                                    pick the relevant policy sections.
+            
+        Returns:
+            A list of invoke()-shaped dicts, in the same order as principle_names.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(principle_name, principle_explanation):
+            async with semaphore:
+                return await self.ainvoke(policy_text, principle_name, principle_explanation)
+
+        if principle_explanations is None:
+            principle_explanations = [""] * len(principle_names)
+        return await asyncio.gather(*(
+            analyze(principle_name, principle_explanation)
+            for principle_name, principle_explanation in zip(principle_names, principle_explanations)
+        ))
+
+    def invoke_batch(self, policy_text: str, principle_names, batch_size: int = BATCH_SIZE):
+        """
+        Analyze a privacy policy against several principles, sending the policy once per batch.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_names: The names of the privacy principles to analyze the policy against.
+            batch_size: The maximum number of principles per LLM request.
+            
+        Returns:
+            A dict mapping each requested principle name to an invoke()-shaped dict
+            ("summary" and "relevant_excerpts"), or to {"error": ...} if its batch failed
+            or the response had no analysis for it; {"error": ...} if the inputs are invalid.
+        """
+        if not policy_text or not principle_names:
+            return {"error": "Missing required inputs: policy_text and principle_names must be provided."}
+            
+        results = {}
+        for start in range(0, len(principle_names), batch_size):
+            batch = principle_names[start:start + batch_size]
+            logger.debug("%s - Analyzing batch of %d principles", self.name, len(batch))
+            try:
+                response = call_llm(
+                    self._client,
+                    self._build_batch_prompt(policy_text, batch),
+                    generation_config={"response_mime_type": "application/json", "response_schema": BATCH_ANALYSIS_SCHEMA},
+                )
+            except Exception as e:
+                error_msg = f"Exception during batched LLM call: {str(e)}"
+                logger.error("%s - %s", self.name, error_msg)
+                results.update((name, {"error": error_msg}) for name in batch)
+                continue
+            results.update(self._parse_batch_response(response, batch))
+        return results
+
+    async def ainvoke_batch(self, policy_text: str, principle_names, batch_size: int = BATCH_SIZE,
+                            max_concurrency: int = MAX_CONCURRENCY):
+        """
+        Asynchronous invoke_batch: batches of principles are analyzed concurrently.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_names: The names of the privacy principles to analyze the policy against.
+            batch_size: The maximum number of principles per LLM request.
+            max_concurrency: The maximum number of LLM requests in flight at once.
+            
+        Returns:
+            The same dict as invoke_batch.
+        """
+        if not policy_text or not principle_names:
+            return {"error": "Missing required inputs: policy_text and principle_names must be provided."}
+            
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(batch):
+            async with semaphore:
+                try:
+                    response = await acall_llm(
+                        self._client,
+                        self._build_batch_prompt(policy_text, batch),
+                        generation_config={"response_mime_type": "application/json", "response_schema": BATCH_ANALYSIS_SCHEMA},
+                    )
+                except Exception as e:
+                    error_msg = f"Exception during batched LLM call: {str(e)}"
+                    logger.error("%s - %s", self.name, error_msg)
+                    return {name: {"error": error_msg} for name in batch}
+                return self._parse_batch_response(response, batch)
+
+        batches = [principle_names[start:start + batch_size] for start in range(0, len(principle_names), batch_size)]
+        parsed = await asyncio.gather(*(analyze(batch) for batch in batches))
+        results = {}
+        for batch_result in parsed:
+            results.update(batch_result)
+        return results
+
+    @staticmethod
+    def _build_batch_prompt(policy_text: str, principle_names) -> str:
+        """
+        Build one prompt that asks for an analysis of every principle in principle_names.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_names: The names of the privacy principles.
+            
+        Returns:
+            The prompt to send to the LLM.
+        """
+        numbered = "\n".join(f"{i}. {name}" for i, name in enumerate(principle_names, 1))
+        return (
+            f"Analyze the following privacy policy text to determine how it addresses each of the privacy principles listed below.\n\n"
+            f"PRIVACY POLICY TEXT:\n{policy_text}\n\n"
+            f"PRINCIPLES:\n{numbered}\n\n"
+            f"For each principle, summarize how the policy addresses it and quote the relevant excerpts "
+            f"with the section they appear under. If the policy does not address a principle, state that "
+            f"clearly and return no excerpts. Use each principle's name exactly as listed."
+        )
+
+    def _parse_batch_response(self, response, principle_names):
+        """
+        Parse a JSON batch response into a dict keyed by the requested principle names.
+        
+        The model does not always echo the names exactly, so each returned analysis is
+        matched to a requested name ignoring case and punctuation, and otherwise by its
+        position in the list.
+        
+        Args:
+            response: The response returned by the model.
+            principle_names: The principle names the batch asked about, in prompt order.
+            
+        Returns:
+            A dict mapping each of principle_names to {"summary": str, "relevant_excerpts": list[dict]},
+            or to {"error": ...} if the response is invalid or has no analysis for it.
+        """
+        try:
+            analyses = json.loads(response.text).get("analyses", [])
+            if not isinstance(analyses, list):
+                raise ValueError("'analyses' is not a list")
+        except (AttributeError, TypeError, ValueError) as e:
+            error_msg = f"Failed to generate batched analysis: empty or invalid response from LLM ({e})."
+            logger.error("%s - %s", self.name, error_msg)
+            return {name: {"error": error_msg} for name in principle_names}
+
+        requested = {_NAME_PUNCTUATION.sub(" ", name.lower()).strip(): name for name in principle_names}
+        matched = {}
+        unmatched = []
+        for position, item in enumerate(analyses):
+            if not isinstance(item, dict) or not isinstance(item.get("summary"), str):
+                continue
+            analysis = {"summary": item["summary"], "relevant_excerpts": item.get("relevant_excerpts") or []}
+            name = requested.get(_NAME_PUNCTUATION.sub(" ", str(item.get("principle", "")).lower()).strip())
+            if name is None or name in matched:
+                unmatched.append((position, analysis))
+            else:
+                matched[name] = analysis
+        for position, analysis in unmatched:
+            if position < len(principle_names) and principle_names[position] not in matched:
+                matched[principle_names[position]] = analysis
+
+        missing = [name for name in principle_names if name not in matched]
+        if missing:
+            logger.error("%s - Batched response has no analysis for: %s", self.name, ", ".join(missing))
+        return {
+            name: matched.get(name, {"error": "The batched LLM response has no analysis for this principle."})
+            for name in principle_names
+        }
+
+    @staticmethod
+    def _build_prompt(policy_text: str, principle_name: str, principle_explanation: str = "") -> str:
+        """
+        Build the analysis prompt for one principle.
+        
+        Long policies are cut down to the sections most relevant to the principle
+        (see select_relevant_sections) before being embedded in the prompt.
+        
+        Args:
+            policy_text: The privacy policy text to analyze.
+            principle_name: The name of the privacy principle.
+            principle_explanation: Optional explanation of the principle, used for ranking sections.
+            
+        Returns:
+            The prompt to send to the LLM.
+        """
+        policy_text = select_relevant_sections(policy_text, f"{principle_name} {principle_explanation}")
+        return (
+            f"Analyze the following privacy policy text to determine how it addresses the privacy principle of '{principle_name}'.\n\n"
+            f"PRIVACY POLICY TEXT:\n{policy_text}\n\n"
+            f"Summarize how the policy addresses the principle of '{principle_name}' and quote the relevant "
+            f"excerpts with the section they appear under. If the policy does not address this principle, "
+            f"state that clearly and return no excerpts."
+        )
+
+    def _analysis_from_response(self, response):
+        """
+        Parse the JSON analysis from an LLM response.
+        
+        Args:
+            response: The response returned by the model.
+            
+        Returns:
+            A dict with "summary" and "relevant_excerpts", or {"error": ...} if the
+            response has no text or is not valid JSON.
+        """
+        try:
+            parsed = json.loads(response.text)
+        except (AttributeError, ValueError) as e:
+            error_msg = f"Failed to generate analysis: empty or invalid response from LLM ({e})."
+            logger.error("%s - %s", self.name, error_msg)
+            return {"error": error_msg}
+        analysis = {
+            "summary": parsed.get("summary", ""),
+            "relevant_excerpts": parsed.get("relevant_excerpts", []),
+        }
+        logger.debug("%s - Generated analysis (first 100 chars): '%.100s...'", self.name, analysis["summary"])
+        return analysis
 
 
 # For testing directly
 if __name__ == "__main__":
     print("--- Testing PolicyAnalyzerAgent --- (Requires GOOGLE_API_KEY)")
     
-    if not os.getenv("GOOGLE_API_KEY"):
+    if not get_api_key():
         print("\nWARNING: GOOGLE_API_KEY environment variable not found.")
         print("LLM calls will fail. Set this in your environment or .env file.")
         exit(1)
@@ -171,19 +465,10 @@ if __name__ == "__main__":
     # Test with different principles
     principles = ["Data Minimization", "Purpose Limitation", "Right to Access"]
     
-    for principle in principles:
-        print(f"\n--- Analyzing for: {principle} ---")
-        
-        # Create a mock context with the required inputs
-        class MockContext:
-            def __init__(self):
-                self.state = {
-                    'policy_text': sample_policy,
-                    'principle_name': principle
-                }
-        
-        # Invoke the agent
-        result = agent.invoke("Analyze this privacy policy", MockContext())
+    # Analyze all principles concurrently
+    results = asyncio.run(agent.ainvoke_many(sample_policy, principles))
+    for principle, result in zip(principles, results):
+        print(f"\n--- Analysis for: {principle} ---")
         print(f"\nResult:\n{result}")
     
     print("\n--- Test Complete ---")
@@ -1,7 +1,14 @@
 # privacy_agent/agents/policy_fetcher_agent.py
+import asyncio
+import logging
 import typing
 from google.adk.agents import Agent
-from privacy_agent.utils.web_parser import fetch_url_content, extract_text_from_html
+from privacy_agent.utils.web_parser import fetch_and_extract
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent fetches issued by ainvoke
+MAX_CONCURRENT_FETCHES = 32
 
 class PolicyFetcherAgent(Agent):
     """
@@ -46,16 +53,49 @@ class PolicyFetcherAgent(Agent):
         if not url:
             return {"error": "URL not provided in input_request."}
 
-        print(f"{self.name}: Fetching policy from URL: {url}")
-        html_content = fetch_url_content(url)
+        logger.debug("%s: Fetching policy from URL: %s", self.name, url)
+        # The page is parsed while it downloads
+        extracted_text = fetch_and_extract(url)
 
-        if html_content is None:
+        if extracted_text is None:
             error_message = f"Failed to fetch content from URL: {url}"
-            print(f"{self.name}: {error_message}")
+            logger.error("%s: %s", self.name, error_message)
             return {"error": error_message}
 
-        print(f"{self.name}: Extracting text from HTML content (length: {len(html_content)}).")
-        extracted_text = extract_text_from_html(html_content)
-        print(f"{self.name}: Successfully extracted text (length: {len(extracted_text)}).")
+        logger.debug("%s: Successfully extracted text (length: %d).", self.name, len(extracted_text))
 
         return {"extracted_text": extracted_text}
+
+    async def ainvoke(self, urls: list[str]) -> list[typing.Dict[str, any]]:
+        """
+        Fetches and extracts text from several URLs concurrently.
+
+        Each blocking fetch-and-parse runs in a worker thread, so pages are
+        parsed while other fetches are still in flight.
+
+        Args:
+            urls: The URLs to process.
+
+        Returns:
+            One output dictionary per URL, in the same order as urls, each shaped
+            like the result of invoke().
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def process(url):
+            if not url:
+                return {"error": "URL not provided in input_request."}
+
+            logger.debug("%s: Fetching policy from URL: %s", self.name, url)
+            async with semaphore:
+                extracted_text = await asyncio.to_thread(fetch_and_extract, url)
+
+            if extracted_text is None:
+                error_message = f"Failed to fetch content from URL: {url}"
+                logger.error("%s: %s", self.name, error_message)
+                return {"error": error_message}
+
+            logger.debug("%s: Successfully extracted text from %s (length: %d).", self.name, url, len(extracted_text))
+            return {"extracted_text": extracted_text}
+
+        return await asyncio.gather(*(process(url) for url in urls))
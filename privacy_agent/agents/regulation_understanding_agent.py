@@ -1,29 +1,57 @@
 """
 RegulationUnderstandingAgent: Explains privacy principles and regulations using an LLM.
 """
-import os
+import logging
 import sys
-from dotenv import load_dotenv
-import google.generativeai as genai
+import typing
+from collections import OrderedDict
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
+from pydantic import PrivateAttr
+from privacy_agent._env import get_api_key
+from privacy_agent.llm.client import get_gemini, get_generative_model
+from privacy_agent.llm.retry import acall_llm, call_llm
+from privacy_agent.utils.cache import DiskCache, make_key
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Check for API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
-    print(f"DEBUG: RegulationUnderstandingAgent - Configured genai with GOOGLE_API_KEY")
-else:
-    print("DEBUG: RegulationUnderstandingAgent - GOOGLE_API_KEY not found in environment. GenAI calls will likely fail.")
+# Explanations of a principle do not depend on the policy being assessed, so they
+# are kept across runs
+_explanation_cache = DiskCache("reg_explanations")
+
+# Explanations already read or generated in this process, so repeated principles
+# skip the disk cache as well
+_RECENT_EXPLANATIONS_SIZE = 128
+_recent_explanations = OrderedDict()
+
+
+def _get_explanation(cache_key: str):
+    """Returns the cached explanation for `cache_key` from memory or disk, or None."""
+    explanation = _recent_explanations.get(cache_key)
+    if explanation is not None:
+        _recent_explanations.move_to_end(cache_key)
+        return explanation
+    explanation = _explanation_cache.get(cache_key)
+    if explanation is not None:
+        _remember_explanation(cache_key, explanation)
+    return explanation
+
+
+def _remember_explanation(cache_key: str, explanation: str) -> None:
+    """Keeps `explanation` in the in-memory LRU, evicting the least recently used entry."""
+    _recent_explanations[cache_key] = explanation
+    _recent_explanations.move_to_end(cache_key)
+    if len(_recent_explanations) > _RECENT_EXPLANATIONS_SIZE:
+        _recent_explanations.popitem(last=False)
 
 class RegulationUnderstandingAgent(Agent):
     """
     An agent that explains privacy principles and regulations using an LLM.
     """
     
+    # google.generativeai client the agent calls with text prompts; self.model is the
+    # ADK Gemini used by the ADK runtime, which takes LlmRequest objects instead
+    _client: typing.Any = PrivateAttr(default=None)
+    
     def __init__(self, model_name: str = "gemini-2.0-flash", name: str = "RegulationUnderstander"):
         """
         Initialize the RegulationUnderstandingAgent.
@@ -32,21 +60,15 @@ class RegulationUnderstandingAgent(Agent):
             model_name: The name of the LLM model to use.
             name: The name of the agent.
         """
-        print(f"DEBUG: {name} - Initializing with model {model_name}")
-        
-        # Try both API key environment variables
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        api_key_to_use = google_api_key or gemini_api_key
+        logger.debug("%s - Initializing with model %s", name, model_name)
         
-        llm_instance = None
-        if api_key_to_use:
-            key_source = "GOOGLE_API_KEY" if google_api_key else "GEMINI_API_KEY"
-            print(f"DEBUG: {name} - API key found from {key_source}. Creating Gemini instance with this API key.")
-            llm_instance = Gemini(model_name=model_name, api_key=api_key_to_use)
+        # GOOGLE_API_KEY or GEMINI_API_KEY, read once per process
+        if get_api_key():
+            logger.debug("%s - API key found. Using shared Gemini instance with this API key.", name)
         else:
-            print(f"ERROR: {name} - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.")
-            llm_instance = Gemini(model_name=model_name)
+            logger.error("%s - No API key found in environment (checked both GOOGLE_API_KEY and GEMINI_API_KEY). Creating Gemini without explicit API key. This will likely fail if global genai.configure() also failed.", name)
+        # One Gemini instance per model name, shared by all sub-agents
+        llm_instance = get_gemini(model_name)
         
         super().__init__(
             model=llm_instance,
@@ -54,29 +76,99 @@ class RegulationUnderstandingAgent(Agent):
             description="Explains privacy principles and regulations using an LLM.",
             instruction="""You are an expert in privacy regulations and data protection. Your task is to clearly and concisely explain the given privacy principle or regulation. Focus on its core meaning, its importance, and provide a simple example if possible. The user will provide the name of the principle or regulation to be explained.""",
         )
-        print(f"DEBUG: {name} - Initialization complete")
+        self._client = get_generative_model(model_name)
+        logger.debug("%s - Initialization complete", name)
 
-    def invoke(self, input_request: str, context=None):
+    def invoke(self, input_request: str, context=None, force_refresh: bool = False):
         """
         Explain a privacy principle or regulation.
         
         Args:
             input_request: The user's request, typically asking for an explanation of a privacy principle.
             context: The invocation context, which may contain additional information.
+            force_refresh: If True, ignore any cached explanation and query the LLM.
             
         Returns:
-            A string explanation of the privacy principle or regulation.
+            A string explanation of the privacy principle or regulation, or an
+            "Error: ..." string if no name was given or the LLM call failed.
+        """
+        logger.debug("%s - invoke() called with input: '%s'", self.name, input_request)
+        query = self._resolve_query(input_request, context)
+        if not query:
+            error_msg = "Privacy principle/regulation name not provided."
+            logger.error("%s - %s", self.name, error_msg)
+            return f"Error: {error_msg}"
+        cache_key = self._cache_key(query)
+        if not force_refresh:
+            cached = _get_explanation(cache_key)
+            if cached is not None:
+                logger.debug("%s - Using cached explanation for '%s'", self.name, query)
+                return cached
+        
+        try:
+            # Use the model to generate a response
+            response = call_llm(self._client, self._build_prompt(query))
+            return self._explanation_from_response(response, cache_key)
+                
+        except Exception as e:
+            error_msg = f"Exception during LLM call: {str(e)}"
+            logger.error("%s - %s", self.name, error_msg)
+            return f"Error: {error_msg}"
+
+    async def ainvoke(self, input_request: str, context=None, force_refresh: bool = False):
+        """
+        Asynchronously explain a privacy principle or regulation.
+        
+        Args:
+            input_request: The user's request, typically asking for an explanation of a privacy principle.
+            context: The invocation context, which may contain additional information.
+            force_refresh: If True, ignore any cached explanation and query the LLM.
+            
+        Returns:
+            A string explanation of the privacy principle or regulation, or an
+            "Error: ..." string if no name was given or the LLM call failed.
+        """
+        logger.debug("%s - ainvoke() called with input: '%s'", self.name, input_request)
+        query = self._resolve_query(input_request, context)
+        if not query:
+            error_msg = "Privacy principle/regulation name not provided."
+            logger.error("%s - %s", self.name, error_msg)
+            return f"Error: {error_msg}"
+        cache_key = self._cache_key(query)
+        if not force_refresh:
+            cached = _get_explanation(cache_key)
+            if cached is not None:
+                logger.debug("%s - Using cached explanation for '%s'", self.name, query)
+                return cached
+        
+        try:
+            response = await acall_llm(self._client, self._build_prompt(query))
+            return self._explanation_from_response(response, cache_key)
+        except Exception as e:
+            error_msg = f"Exception during LLM call: {str(e)}"
+            logger.error("%s - %s", self.name, error_msg)
+            return f"Error: {error_msg}"
+
+    def _resolve_query(self, input_request: str, context=None) -> str:
         """
-        print(f"DEBUG: {self.name} - invoke() called with input: '{input_request}'")
+        Determine which principle or regulation to explain.
         
+        Args:
+            input_request: The user's request.
+            context: The invocation context, which may contain a regulation_name.
+            
+        Returns:
+            The regulation name from the context or request, or the whole request,
+            stripped; an empty string if neither holds any text.
+        """
         # Extract the regulation name from context if available
         regulation_name = None
         if context and hasattr(context, 'state') and 'regulation_name' in context.state:
             regulation_name = context.state['regulation_name']
-            print(f"DEBUG: {self.name} - Found regulation_name in context: '{regulation_name}'")
+            logger.debug("%s - Found regulation_name in context: '%s'", self.name, regulation_name)
         
         # If regulation_name is not in context, try to extract it from the input_request
-        if not regulation_name:
+        if not regulation_name and isinstance(input_request, str):
             # This is a simple heuristic; in a real agent, you might use more sophisticated NLP
             if "explain" in input_request.lower() and "principle" in input_request.lower():
                 # Try to extract the principle name from the request
@@ -86,36 +178,44 @@ class RegulationUnderstandingAgent(Agent):
                     if potential_name.startswith("of "):
                         potential_name = potential_name[3:].strip()
                     regulation_name = potential_name
-                    print(f"DEBUG: {self.name} - Extracted regulation_name from input: '{regulation_name}'")
+                    logger.debug("%s - Extracted regulation_name from input: '%s'", self.name, regulation_name)
         
         # If we still don't have a regulation name, use the whole input as the query
         query = regulation_name if regulation_name else input_request
-        print(f"DEBUG: {self.name} - Using query: '{query}'")
+        query = query.strip() if isinstance(query, str) else ""
+        logger.debug("%s - Using query: '%s'", self.name, query)
+        return query
+
+    def _cache_key(self, query: str) -> str:
+        """Key for the cached explanation of `query` from this agent's model."""
+        model_id = self.model if isinstance(self.model, str) else getattr(self.model, "model", "")
+        return make_key(model_id, query.strip().lower())
+
+    @staticmethod
+    def _build_prompt(query: str) -> str:
+        """Build the explanation prompt for a principle or regulation."""
+        return f"Explain the privacy principle or regulation known as '{query}'. Focus on its core meaning, importance, and provide a simple example."
+
+    def _explanation_from_response(self, response, cache_key: str):
+        """
+        Extract the explanation text from an LLM response and cache it on success.
         
-        try:
-            # Ensure GOOGLE_API_KEY is set, otherwise GenerativeModel() will fail
-            if not os.getenv("GOOGLE_API_KEY"):
-                error_msg = "GOOGLE_API_KEY environment variable not set. LLM call will fail."
-                print(f"ERROR: {self.name} - {error_msg}")
-                return f"Error: {error_msg}"
-            
-            # Use the model to generate a response
-            response = self.model.generate_content(
-                f"Explain the privacy principle or regulation known as '{query}'. Focus on its core meaning, importance, and provide a simple example."
-            )
+        Args:
+            response: The response returned by the model.
+            cache_key: The key under which to cache a successful explanation.
             
-            if response and hasattr(response, 'text'):
-                explanation = response.text.strip()
-                print(f"DEBUG: {self.name} - Generated explanation (first 100 chars): '{explanation[:100]}...'")
-                return explanation
-            else:
-                error_msg = "Failed to generate explanation: empty or invalid response from LLM."
-                print(f"ERROR: {self.name} - {error_msg}")
-                return f"Error: {error_msg}"
-                
-        except Exception as e:
-            error_msg = f"Exception during LLM call: {str(e)}"
-            print(f"ERROR: {self.name} - {error_msg}")
+        Returns:
+            The stripped explanation, or an error string if the response has no text.
+        """
+        if response and hasattr(response, 'text'):
+            explanation = response.text.strip()
+            logger.debug("%s - Generated explanation (first 100 chars): '%.100s...'", self.name, explanation)
+            _explanation_cache.set(cache_key, explanation)
+            _remember_explanation(cache_key, explanation)
+            return explanation
+        else:
+            error_msg = "Failed to generate explanation: empty or invalid response from LLM."
+            logger.error("%s - %s", self.name, error_msg)
             return f"Error: {error_msg}"
 
 
@@ -128,7 +228,7 @@ if __name__ == "__main__":
     agent = RegulationUnderstandingAgent()
     
     # Test with a sample regulation
-    if not os.getenv("GOOGLE_API_KEY"):
+    if not get_api_key():
         print("\nWARNING: GOOGLE_API_KEY environment variable not found.")
         print("LLM calls will likely fail. Set this in your environment or .env file.")
     
@@ -1,20 +1,123 @@
 """
 ReportGeneratorAgent: Compiles findings from other agents into a comprehensive report.
 """
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import dataclasses
+import io
+import logging
+from functools import lru_cache
+from typing import NamedTuple
+
 from google.adk.agents import Agent
+from privacy_agent.llm.client import configure_genai
+from privacy_agent.llm.context_cache import create_cached_content
+from privacy_agent.llm.retry import acall_llm, call_llm
 from privacy_agent.data_structures import AssessmentResult, PolicyAnalysisResult, ComplianceAssessmentResult
+from privacy_agent.utils.cache import DiskCache, make_key
+
+logger = logging.getLogger(__name__)
+
+# Reports for identical inputs are reused across runs
+_report_cache = DiskCache("reports")
+
+
+class _NormalizedAssessment(NamedTuple):
+    """The fields of one assessment result that appear in the report prompt, as strings."""
+    principle_name: str
+    explanation: str
+    analysis_summary: str
+    excerpts: str
+    compliance_level: str
+    justification: str
+    suggestions: str
+
+
+def _fields(value) -> dict:
+    """
+    Returns the fields of a nested analysis or compliance result as a dict.
+
+    PolicyAnalyzerAgent returns analyses as dicts with the same keys as the
+    PolicyAnalysisResult / ComplianceAssessmentResult dataclasses, so both forms
+    are read the same way. Missing values give an empty dict.
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return value
+    # The dataclasses are slotted, so they have no __dict__ to read
+    return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+
+
+def _normalize(result) -> _NormalizedAssessment:
+    """
+    Flattens an AssessmentResult object or an equivalent dict into a _NormalizedAssessment.
+
+    Args:
+        result: An AssessmentResult (with PolicyAnalysisResult / ComplianceAssessmentResult
+                members) or a dict shaped like AssessmentResult.to_dict().
+
+    Returns:
+        The normalized, hashable assessment with excerpts and suggestions pre-joined.
+    """
+    if isinstance(result, dict):
+        principle_name = result.get('principle_name', 'Unknown Principle')
+        explanation = result.get('principle_explanation', 'No explanation provided.')
+        analysis = _fields(result.get('policy_analysis'))
+        compliance = _fields(result.get('compliance_assessment'))
+    else:
+        principle_name = getattr(result, 'principle_name', 'Unknown Principle')
+        explanation = getattr(result, 'principle_explanation', 'No explanation provided.')
+        analysis = _fields(getattr(result, 'policy_analysis', None))
+        compliance = _fields(getattr(result, 'compliance_assessment', None))
+
+    if analysis:
+        analysis_summary = analysis.get('summary', 'No analysis summary provided.')
+        relevant_excerpts_list = analysis.get('relevant_excerpts', [])
+    else:
+        analysis_summary = 'No analysis provided.'
+        relevant_excerpts_list = []
+
+    return _NormalizedAssessment(
+        principle_name=str(principle_name),
+        explanation=str(explanation),
+        analysis_summary=str(analysis_summary),
+        excerpts="\n".join(
+            f"  - Excerpt: {ex.get('excerpt', 'N/A')}\n    (Location: {ex.get('location_context', 'N/A')})"
+            for ex in relevant_excerpts_list
+        ),
+        compliance_level=str(compliance.get('level', 'N/A')),
+        justification=str(compliance.get('justification', 'N/A')),
+        suggestions="\n".join(f"  - {s}" for s in compliance.get('suggestions', [])),
+    )
 
-# Load environment variables
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
-if not google_api_key:
-    print("WARNING: GOOGLE_API_KEY not found in environment variables. LLM functionality may not work properly.")
-else:
-    genai.configure(api_key=google_api_key)
-    print(f"DEBUG: ReportGeneratorAgent - Configured genai with GOOGLE_API_KEY")
+
+@lru_cache(maxsize=32)
+def _format_assessments(assessments: tuple[_NormalizedAssessment, ...]) -> str:
+    """
+    Formats normalized assessment results into the markdown section of the report prompt.
+
+    Sections with nothing to show (no excerpts, no suggestions) are left out.
+
+    Args:
+        assessments: The normalized assessment results, in report order.
+
+    Returns:
+        The formatted assessments, separated by blank lines.
+    """
+    buf = io.StringIO()
+    for i, a in enumerate(assessments):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"### Assessment for Principle: {a.principle_name}\n")
+        buf.write(f"**Principle Explanation:** {a.explanation}\n")
+        buf.write(f"**Policy Analysis Summary:** {a.analysis_summary}\n")
+        if a.excerpts:
+            buf.write(f"**Relevant Excerpts:**\n{a.excerpts}\n")
+        buf.write(f"**Compliance Level:** {a.compliance_level}\n")
+        buf.write(f"**Justification:** {a.justification}\n")
+        if a.suggestions:
+            buf.write(f"**Suggestions for Improvement:**\n{a.suggestions}\n")
+        buf.write("---")
+    return buf.getvalue()
 
 
 REPORT_GENERATOR_PROMPT = """
@@ -59,24 +162,19 @@ Instructions:
 - If policy excerpts were provided in the analysis, you can choose to include very short, key excerpts in the 'Policy Analysis Summary' if they are highly illustrative. Avoid copying large chunks.
 """
 
+def _policy_block(policy_text: str) -> str:
+    """The policy section of the report prompt; also the unit uploaded by cache_policy()."""
+    return f"## Full Privacy Policy Text:\n---BEGIN POLICY TEXT---\n{policy_text}\n---END POLICY TEXT---\n\n"
+
+
 class ReportGeneratorAgent(Agent):
     """Agent to generate a comprehensive privacy assessment report."""
 
     def __init__(self, model_name: str = "gemini-2.0-flash", name: str = "ReportGenerator"):
-        # Ensure the GOOGLE_API_KEY is loaded for the ADK Agent to use internally.
-        # The ADK Agent base class should handle the LLM client initialization when a model name string is provided.
-        # We also need to ensure genai is configured if the ADK doesn't do it explicitly.
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            print(f"WARNING: {name} - GOOGLE_API_KEY not found. LLM functionality might be affected if ADK relies on it being pre-configured.")
-        else:
-            # It's generally safe to call configure multiple times if needed, 
-            # or the ADK might do this itself. Let's ensure it's done once.
-            try:
-                genai.configure(api_key=api_key)
-                print(f"DEBUG: {name} - Configured genai with GOOGLE_API_KEY in __init__")
-            except Exception as e_configure:
-                print(f"ERROR: {name} - Error configuring genai in __init__: {e_configure}")
+        # The ADK Agent base class handles the LLM client initialization when a model name string is provided;
+        # invoke() builds a google.generativeai client, which needs the process-wide configuration.
+        if not configure_genai():
+            logger.warning("%s - GOOGLE_API_KEY not found. LLM functionality might be affected if ADK relies on it being pre-configured.", name)
 
         super().__init__(
             model=model_name, # Pass the model name string, ADK should handle LLM init
@@ -84,12 +182,14 @@ class ReportGeneratorAgent(Agent):
             description="Generates a comprehensive privacy assessment report based on policy analysis and compliance assessments.",
             instruction=REPORT_GENERATOR_PROMPT,
         )
-        print(f"DEBUG: {name} initialized with model: {model_name}")
+        logger.debug("%s initialized with model: %s", name, model_name)
 
     def invoke(
         self, 
         policy_text: str,
-        assessment_results: list[AssessmentResult] # or list[dict] if not using AssessmentResult directly
+        assessment_results: list[AssessmentResult], # or list[dict] if not using AssessmentResult directly
+        force_refresh: bool = False,
+        cached_content=None,
     ):
         """
         Generates a comprehensive report based on policy text and assessment results.
@@ -98,114 +198,255 @@ class ReportGeneratorAgent(Agent):
             policy_text: The full text of the privacy policy.
             assessment_results: A list of AssessmentResult objects (or dicts) containing 
                                 assessment data for various privacy principles.
+            force_refresh: If True, ignore any cached report and query the LLM.
+            cached_content: Optional handle from cache_policy() for this policy text; the
+                            policy is then referenced from the cache instead of being re-sent.
 
         Returns:
             A formatted report as a string, or None if there was an error.
         """
-        if not assessment_results:
-            print(f"Error in {self.name}: No assessment results provided.")
+        input_prompt = self._build_input_prompt(policy_text, assessment_results)
+        if input_prompt is None:
             return None
 
-        if not policy_text:
-            print(f"Warning in {self.name}: No policy text provided. Report will only be based on assessment results.")
-            policy_text = "No policy text provided."
+        cache_key = self._cache_key(input_prompt)
+        if cached_content is not None:
+            input_prompt = self._build_input_prompt(policy_text, assessment_results, include_policy=False)
+        if not force_refresh:
+            cached_report = _report_cache.get(cache_key)
+            if cached_report is not None:
+                logger.debug("%s returning cached report.", self.name)
+                return cached_report
 
-        # Format the assessment results for the prompt
-        assessments_string_parts = []
-        
-        for result in assessment_results:
-            # Handle both AssessmentResult objects and dicts
-            if isinstance(result, dict):
-                principle_name = result.get('principle_name', 'Unknown Principle')
-                explanation = result.get('principle_explanation', 'No explanation provided.')
-                
-                analysis_obj = result.get('policy_analysis', {})
-                analysis_summary = analysis_obj.get('summary', 'No analysis summary provided.') if analysis_obj else 'No analysis provided.'
-                relevant_excerpts_list = analysis_obj.get('relevant_excerpts', []) if analysis_obj else []
-                
-                compliance_obj = result.get('compliance_assessment', {})
-                compliance_level = compliance_obj.get('level', 'N/A') if compliance_obj else 'N/A'
-                justification = compliance_obj.get('justification', 'N/A') if compliance_obj else 'N/A'
-                suggestions_list = compliance_obj.get('suggestions', []) if compliance_obj else []
-            else:
-                # It's an AssessmentResult object
-                principle_name = getattr(result, 'principle_name', 'Unknown Principle')
-                explanation = getattr(result, 'principle_explanation', 'No explanation provided.')
-                
-                analysis_obj = getattr(result, 'policy_analysis', None)
-                analysis_summary = getattr(analysis_obj, 'summary', 'No analysis summary provided.') if analysis_obj else 'No analysis provided.'
-                relevant_excerpts_list = getattr(analysis_obj, 'relevant_excerpts', []) if analysis_obj else []
-            
-            # Format the excerpts
-            analysis_excerpts = "\n".join([
-                f"  - Excerpt: {ex.get('excerpt', 'N/A')}\n    (Location: {ex.get('location_context', 'N/A')})" 
-                for ex in relevant_excerpts_list
-            ])
-
-            compliance_obj = getattr(result, 'compliance_assessment', None)
-            compliance_level = getattr(compliance_obj, 'level', 'N/A') if compliance_obj else 'N/A'
-            justification = getattr(compliance_obj, 'justification', 'N/A') if compliance_obj else 'N/A'
-            suggestions_list = getattr(compliance_obj, 'suggestions', []) if compliance_obj else []
-            suggestions = "\n".join([f"  - {s}" for s in suggestions_list])
-
-            assessments_string_parts.append(
-                f"### Assessment for Principle: {principle_name}\n"
-                f"**Principle Explanation:** {explanation}\n"
-                f"**Policy Analysis Summary:** {analysis_summary}\n"
-                f"**Relevant Excerpts:**\n{analysis_excerpts if analysis_excerpts else '  None provided.'}\n"
-                f"**Compliance Level:** {compliance_level}\n"
-                f"**Justification:** {justification}\n"
-                f"**Suggestions for Improvement:**\n{suggestions if suggestions else '  None provided.'}\n"
-                f"---"
-            )
-        
-        formatted_assessments = "\n\n".join(assessments_string_parts)
-
-        input_prompt = (
-            f"## Full Privacy Policy Text:\n---BEGIN POLICY TEXT---\n{policy_text}\n---END POLICY TEXT---\n\n"
-            f"## Detailed Assessment Results:\n{formatted_assessments}"
-        )
-
-        print(f"Invoking {self.name} with combined input length: {len(input_prompt)}")
-        # print(f"DEBUG: Report Generator Input Prompt:\n{input_prompt[:2000]}...\n") # For debugging
+        logger.debug("Invoking %s with combined input length: %d", self.name, len(input_prompt))
+        logger.debug("Report Generator Input Prompt:\n%.2000s...", input_prompt)
 
         try:
-            active_llm_client = None
-            
-            # Try to use self.llm if it's a valid client
-            if hasattr(self, 'llm') and isinstance(self.llm, genai.GenerativeModel):
-                active_llm_client = self.llm
-                print(f"Using self.llm (type: {type(self.llm)}) for LLM call in {self.name}.")
-            else:
-                llm_current_type = type(getattr(self, 'llm', None))
-                print(f"self.llm is not a ready GenerativeModel client (type: {llm_current_type}).")
-                # If self.llm is not a client, try to create a local one using self.model (string model name)
-                if isinstance(self.model, str):
-                    print(f"Attempting to create a local LLM client using self.model string: '{self.model}'")
-                    try:
-                        # genai should have been configured in __init__
-                        active_llm_client = genai.GenerativeModel(self.model)
-                        print(f"Local LLM client created successfully (type: {type(active_llm_client)}).")
-                    except Exception as e_create_local:
-                        print(f"Error creating local LLM client in {self.name} invoke: {e_create_local}")
-                        return None # Cannot proceed without a client
-                else:
-                    print(f"Cannot create local LLM client: self.model is not a string. Type: {type(self.model)}.")
-                    return None # Cannot proceed
-            
+            active_llm_client = self._get_llm_client(cached_content)
             if active_llm_client is None:
-                print(f"Critical Error in {self.name} invoke: No LLM client could be established.")
                 return None
             
-            response_obj = active_llm_client.generate_content(input_prompt)
+            response_obj = call_llm(active_llm_client, input_prompt)
             raw_response_text = response_obj.text
 
             if raw_response_text:
-                print(f"{self.name} generated report successfully.")
+                logger.debug("%s generated report successfully.", self.name)
+                _report_cache.set(cache_key, raw_response_text)
                 return raw_response_text
             else:
-                print(f"Error in {self.name}: LLM returned an empty response.")
+                logger.error("Error in %s: LLM returned an empty response.", self.name)
                 return None
         except Exception as e:
-            print(f"Error during {self.name} LLM call: {e}")
+            logger.error("Error during %s LLM call: %s", self.name, e)
+            return None
+
+    def invoke_stream(
+        self,
+        policy_text: str,
+        assessment_results: list[AssessmentResult],
+        force_refresh: bool = False,
+        cached_content=None,
+    ):
+        """
+        Generates the report like invoke(), yielding text chunks as the LLM produces them.
+
+        Args:
+            policy_text: The full text of the privacy policy.
+            assessment_results: A list of AssessmentResult objects (or dicts) containing 
+                                assessment data for various privacy principles.
+            force_refresh: If True, ignore any cached report and query the LLM.
+            cached_content: Optional handle from cache_policy() for this policy text; the
+                            policy is then referenced from the cache instead of being re-sent.
+
+        Yields:
+            Successive chunks of the report text. Nothing is yielded if there was an error.
+        """
+        input_prompt = self._build_input_prompt(policy_text, assessment_results)
+        if input_prompt is None:
+            return
+
+        cache_key = self._cache_key(input_prompt)
+        if cached_content is not None:
+            input_prompt = self._build_input_prompt(policy_text, assessment_results, include_policy=False)
+        if not force_refresh:
+            cached_report = _report_cache.get(cache_key)
+            if cached_report is not None:
+                logger.debug("%s returning cached report.", self.name)
+                yield cached_report
+                return
+
+        logger.debug("Streaming %s with combined input length: %d", self.name, len(input_prompt))
+        chunks = []
+        try:
+            active_llm_client = self._get_llm_client(cached_content)
+            if active_llm_client is None:
+                return
+            # Opening the stream is retried like any other call; a stream that breaks
+            # after chunks were yielded is not, since they cannot be taken back
+            response = call_llm(active_llm_client, input_prompt, stream=True)
+            for chunk in response:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+        except Exception as e:
+            logger.error("Error during %s streaming LLM call: %s", self.name, e)
+            return
+
+        if chunks:
+            logger.debug("%s streamed report successfully.", self.name)
+            _report_cache.set(cache_key, "".join(chunks))
+        else:
+            logger.error("Error in %s: LLM returned an empty response.", self.name)
+
+    async def ainvoke_stream(
+        self,
+        policy_text: str,
+        assessment_results: list[AssessmentResult],
+        force_refresh: bool = False,
+        cached_content=None,
+    ):
+        """
+        Asynchronous invoke_stream(): an async generator of report text chunks.
+
+        Args:
+            policy_text: The full text of the privacy policy.
+            assessment_results: A list of AssessmentResult objects (or dicts) containing 
+                                assessment data for various privacy principles.
+            force_refresh: If True, ignore any cached report and query the LLM.
+            cached_content: Optional handle from cache_policy() for this policy text; the
+                            policy is then referenced from the cache instead of being re-sent.
+
+        Yields:
+            Successive chunks of the report text. Nothing is yielded if there was an error.
+        """
+        input_prompt = self._build_input_prompt(policy_text, assessment_results)
+        if input_prompt is None:
+            return
+
+        cache_key = self._cache_key(input_prompt)
+        if cached_content is not None:
+            input_prompt = self._build_input_prompt(policy_text, assessment_results, include_policy=False)
+        if not force_refresh:
+            cached_report = _report_cache.get(cache_key)
+            if cached_report is not None:
+                logger.debug("%s returning cached report.", self.name)
+                yield cached_report
+                return
+
+        logger.debug("Streaming %s (async) with combined input length: %d", self.name, len(input_prompt))
+        chunks = []
+        try:
+            active_llm_client = self._get_llm_client(cached_content)
+            if active_llm_client is None:
+                return
+            # Only opening the stream is retried (see invoke_stream)
+            response = await acall_llm(active_llm_client, input_prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+        except Exception as e:
+            logger.error("Error during %s streaming LLM call: %s", self.name, e)
+            return
+
+        if chunks:
+            logger.debug("%s streamed report successfully.", self.name)
+            _report_cache.set(cache_key, "".join(chunks))
+        else:
+            logger.error("Error in %s: LLM returned an empty response.", self.name)
+
+    def cache_policy(self, policy_text: str, ttl: int | None = None):
+        """
+        Uploads the policy text to Gemini's context cache for this agent's model.
+
+        Pass the result as `cached_content` to invoke(), invoke_stream() or
+        ainvoke_stream() for the same policy text.
+
+        Args:
+            policy_text: The full text of the privacy policy.
+            ttl: Optional cache lifetime in seconds (defaults to an hour).
+
+        Returns:
+            The cached content handle, or None if the policy is too short to be
+            worth caching or caching failed.
+        """
+        if not policy_text or not isinstance(self.model, str):
+            return None
+        kwargs = {} if ttl is None else {"ttl": ttl}
+        return create_cached_content(self.model, _policy_block(policy_text), **kwargs)
+
+    def _build_input_prompt(self, policy_text: str, assessment_results, include_policy: bool = True) -> str | None:
+        """
+        Builds the LLM input from the policy text and the formatted assessment results.
+
+        Args:
+            policy_text: The full text of the privacy policy.
+            assessment_results: A list of AssessmentResult objects (or dicts).
+            include_policy: If False, leave out the policy text (it is in a cached content).
+
+        Returns:
+            The prompt string, or None if there are no assessment results.
+        """
+        if not assessment_results:
+            logger.error("Error in %s: No assessment results provided.", self.name)
+            return None
+
+        if not policy_text:
+            logger.warning("Warning in %s: No policy text provided. Report will only be based on assessment results.", self.name)
+            policy_text = "No policy text provided."
+
+        # Normalize each result once, then format (memoized for repeated inputs)
+        formatted_assessments = _format_assessments(tuple(_normalize(result) for result in assessment_results))
+
+        assessments_block = f"## Detailed Assessment Results:\n{formatted_assessments}"
+        if not include_policy:
+            return assessments_block
+        return _policy_block(policy_text) + assessments_block
+
+    def _cache_key(self, input_prompt: str) -> str:
+        """The prompt is built deterministically from the inputs, so it identifies the report."""
+        model_id = self.model if isinstance(self.model, str) else getattr(self.model, "model", "")
+        return make_key(model_id, input_prompt)
+
+    def _get_llm_client(self, cached_content=None):
+        """
+        Returns a google.generativeai client for this agent's model, or None if none can be established.
+
+        With `cached_content`, the client is bound to that cache (and its model).
+        """
+        import google.generativeai as genai
+
+        if cached_content is not None:
+            try:
+                return genai.GenerativeModel.from_cached_content(cached_content)
+            except Exception as e:
+                logger.error("Error creating LLM client from cached content in %s: %s", self.name, e)
+                return None
+
+        active_llm_client = None
+        
+        # Try to use self.llm if it's a valid client
+        if hasattr(self, 'llm') and isinstance(self.llm, genai.GenerativeModel):
+            active_llm_client = self.llm
+            logger.debug("Using self.llm (type: %s) for LLM call in %s.", type(self.llm), self.name)
+        else:
+            llm_current_type = type(getattr(self, 'llm', None))
+            logger.debug("self.llm is not a ready GenerativeModel client (type: %s).", llm_current_type)
+            # If self.llm is not a client, try to create a local one using self.model (string model name)
+            if isinstance(self.model, str):
+                logger.debug("Attempting to create a local LLM client using self.model string: '%s'", self.model)
+                try:
+                    # genai was configured once per process in __init__
+                    active_llm_client = genai.GenerativeModel(self.model)
+                    logger.debug("Local LLM client created successfully (type: %s).", type(active_llm_client))
+                except Exception as e_create_local:
+                    logger.error("Error creating local LLM client in %s invoke: %s", self.name, e_create_local)
+                    return None # Cannot proceed without a client
+            else:
+                logger.error("Cannot create local LLM client: self.model is not a string. Type: %s.", type(self.model))
+                return None # Cannot proceed
+        
+        if active_llm_client is None:
+            logger.error("Critical Error in %s invoke: No LLM client could be established.", self.name)
             return None
+        return active_llm_client
@@ -1,24 +1,32 @@
 """
 Defines common data structures used across privacy agents.
 """
+import copy
+import json
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
-@dataclass
+# orjson serializes several times faster than the stdlib encoder; it is optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@dataclass(slots=True)
 class PolicyAnalysisResult:
     """Structure for the output of PolicyAnalyzerAgent."""
     summary: str
     relevant_excerpts: List[Dict[str, str]] = field(default_factory=list)
     # Example for excerpt: {'excerpt': 'text', 'location_context': 'Section 1'}
 
-@dataclass
+@dataclass(slots=True)
 class ComplianceAssessmentResult:
     """Structure for the output of ComplianceAssessorAgent."""
     level: str
     justification: str
     suggestions: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class AssessmentResult:
     """Overall assessment result for a single privacy principle."""
     principle_name: str
@@ -30,16 +38,37 @@ class AssessmentResult:
     additional_details: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Converts the AssessmentResult to a dictionary for serialization or LLM input."""
+        """
+        Converts the AssessmentResult to a dictionary for serialization or LLM input.
+
+        Builds the dict directly instead of through dataclasses.asdict, which
+        inspects and recurses into every field on each call. Mutable values are
+        copied as asdict copies them; missing nested results serialize as empty dicts.
+        """
+        analysis = self.policy_analysis
+        assessment = self.compliance_assessment
         return {
             "principle_name": self.principle_name,
             "principle_explanation": self.principle_explanation,
             "policy_text_snippet": self.policy_text_snippet,
-            "policy_analysis": self.policy_analysis.__dict__ if self.policy_analysis else {},
-            "compliance_assessment": self.compliance_assessment.__dict__ if self.compliance_assessment else {},
-            "additional_details": self.additional_details
+            "policy_analysis": {
+                "summary": analysis.summary,
+                "relevant_excerpts": [dict(excerpt) for excerpt in analysis.relevant_excerpts],
+            } if analysis is not None else {},
+            "compliance_assessment": {
+                "level": assessment.level,
+                "justification": assessment.justification,
+                "suggestions": list(assessment.suggestions),
+            } if assessment is not None else {},
+            "additional_details": copy.deepcopy(self.additional_details),
         }
 
+    def to_json(self) -> bytes:
+        """Serializes to_dict() as compact UTF-8 JSON, using orjson when it is installed."""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 if __name__ == '__main__':
     # Example Usage
     analysis_res = PolicyAnalysisResult(
@@ -63,3 +92,5 @@ if __name__ == '__main__':
     print(full_assessment)
     print("\nAssessmentResult as dict:")
     print(full_assessment.to_dict())
+    print("\nAssessmentResult as JSON:")
+    print(full_assessment.to_json().decode("utf-8"))
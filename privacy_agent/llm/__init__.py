@@ -0,0 +1,2 @@
+# privacy_agent/llm/__init__.py
+# Shared LLM client setup for the privacy agents.
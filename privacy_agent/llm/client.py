@@ -0,0 +1,88 @@
+# privacy_agent/llm/client.py
+"""
+Process-wide LLM clients shared by the privacy agents.
+"""
+import threading
+from functools import cache, lru_cache
+
+from privacy_agent._env import get_api_key
+
+# Serializes first-time client setup when agents are built from several threads
+_lock = threading.RLock()
+
+
+@cache
+def _configure_genai():
+    import google.generativeai as genai
+
+    api_key = get_api_key()
+    if api_key:
+        genai.configure(api_key=api_key)
+    return api_key
+
+
+def configure_genai():
+    """
+    Configures the global google.generativeai client with the API key, once.
+
+    Returns:
+        The API key used, or None if no key is set (in which case genai is
+        left unconfigured).
+    """
+    with _lock:
+        return _configure_genai()
+
+
+@lru_cache(maxsize=None)
+def _get_gemini(model_name: str):
+    from google.adk.models.google_llm import Gemini
+
+    # Gemini reads the model from `model` and the API key from the environment;
+    # configuring genai here keeps the first-call setup in one place
+    configure_genai()
+    return Gemini(model=model_name)
+
+
+@lru_cache(maxsize=None)
+def _get_generative_model(model_name: str):
+    import google.generativeai as genai
+
+    configure_genai()
+    return genai.GenerativeModel(model_name)
+
+
+def get_generative_model(model_name: str):
+    """
+    Returns the shared google.generativeai GenerativeModel for `model_name`.
+
+    This is the client the agents call directly (generate_content /
+    generate_content_async with a text prompt). The ADK Gemini instance from
+    get_gemini() takes LlmRequest objects instead and is only used by the ADK
+    runtime.
+
+    Args:
+        model_name: The name of the Gemini model.
+
+    Returns:
+        The shared GenerativeModel.
+    """
+    with _lock:
+        return _get_generative_model(model_name)
+
+
+def get_gemini(model_name: str):
+    """
+    Returns the shared Gemini model instance for `model_name`.
+
+    Every agent using the same model name receives the same instance, so the
+    client and its credentials are set up once per model rather than once per
+    agent. The first call also configures google.generativeai.
+
+    Args:
+        model_name: The name of the Gemini model.
+
+    Returns:
+        The shared Gemini instance.
+    """
+    with _lock:
+        return _get_gemini(model_name)
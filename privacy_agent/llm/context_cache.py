@@ -0,0 +1,47 @@
+# privacy_agent/llm/context_cache.py
+"""
+Gemini context caching: upload a large, reused prompt prefix once and refer to
+it by handle in later generate_content calls.
+"""
+import logging
+
+from privacy_agent.llm.client import configure_genai
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of a cached content entry on the Gemini side, in seconds
+DEFAULT_TTL = 60 * 60  # 1 hour
+
+# Gemini rejects caches below a minimum token count, and for short texts the
+# extra create call costs more than it saves (roughly 4 characters per token)
+MIN_CACHED_CHARS = 16_000
+
+
+def create_cached_content(model_name: str, text: str, ttl: int = DEFAULT_TTL):
+    """
+    Uploads `text` as cached content for `model_name`.
+
+    Args:
+        model_name: The model the cache will be used with; a cache only works with that model.
+        text: The content to cache.
+        ttl: Lifetime of the cache in seconds.
+
+    Returns:
+        The google.generativeai CachedContent, or None if `text` is too short to be
+        worth caching or the cache could not be created (callers then send the
+        text inline as before).
+    """
+    if len(text) < MIN_CACHED_CHARS:
+        return None
+    if not configure_genai():
+        return None
+
+    from google.generativeai import caching
+
+    try:
+        cached = caching.CachedContent.create(model=model_name, contents=[text], ttl=ttl)
+    except Exception as e:
+        logger.warning("Could not create cached content for %s: %s", model_name, e)
+        return None
+    logger.debug("Created cached content %s (%d chars) for %s", cached.name, len(text), model_name)
+    return cached
@@ -0,0 +1,88 @@
+# privacy_agent/llm/retry.py
+"""
+Bounded retries for transient Gemini errors (rate limits, overload, dropped connections).
+"""
+import logging
+from functools import cache
+
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+logger = logging.getLogger(__name__)
+
+# Total attempts per call, including the first one
+MAX_ATTEMPTS = 3
+# Upper bound on a single backoff wait, in seconds
+MAX_WAIT = 30
+
+
+@cache
+def _transient_errors() -> tuple:
+    """Returns the exception types worth retrying; google.api_core is imported on first use."""
+    from google.api_core import exceptions
+
+    return (
+        exceptions.ResourceExhausted,  # 429
+        exceptions.ServiceUnavailable,  # 503
+        exceptions.InternalServerError,  # 500
+        exceptions.DeadlineExceeded,  # 504
+        ConnectionError,
+    )
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Returns True if `exc` is a rate-limit, server-side or connection error that
+    may succeed when retried.
+    """
+    return isinstance(exc, _transient_errors())
+
+
+_retry = retry(
+    retry=retry_if_exception(is_transient_error),
+    wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+
+@_retry
+def call_llm(client, prompt, **kwargs):
+    """
+    Calls `client.generate_content(prompt, **kwargs)`, retrying transient errors.
+
+    Waits grow exponentially with random jitter, so concurrent callers hitting a
+    rate limit do not retry in lockstep. After MAX_ATTEMPTS the last error is
+    re-raised unchanged, as is any non-transient error.
+
+    Args:
+        client: A model exposing generate_content (e.g. a google.generativeai GenerativeModel).
+        prompt: The prompt to send.
+        kwargs: Extra arguments for generate_content (e.g. generation_config).
+
+    Returns:
+        The generate_content response.
+    """
+    return client.generate_content(prompt, **kwargs)
+
+
+@_retry
+async def acall_llm(client, prompt, **kwargs):
+    """
+    Asynchronous call_llm, using `client.generate_content_async`.
+
+    Args:
+        client: A model exposing generate_content_async.
+        prompt: The prompt to send.
+        kwargs: Extra arguments for generate_content_async.
+
+    Returns:
+        The generate_content_async response.
+    """
+    return await client.generate_content_async(prompt, **kwargs)
@@ -0,0 +1,95 @@
+# privacy_agent/utils/cache.py
+"""
+A small persistent JSON cache for LLM responses that do not change between runs.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Entries older than this are treated as missing
+DEFAULT_TTL = 30 * 24 * 60 * 60  # 30 days, in seconds
+
+
+def make_key(*parts: str) -> str:
+    """
+    Builds a cache key from the given parts.
+
+    Args:
+        parts: Strings identifying the cached value (e.g. model name and prompt input).
+
+    Returns:
+        The hex SHA-256 digest of the parts joined with "|".
+    """
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_root() -> Path:
+    """
+    Returns the root cache directory.
+
+    PRIVACY_AGENT_CACHE_DIR overrides the default of ~/.cache/privacy_agent.
+    """
+    override = os.getenv("PRIVACY_AGENT_CACHE_DIR")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "privacy_agent"
+
+
+class DiskCache:
+    """
+    Stores JSON-serializable values as one file per key under cache_root()/namespace.
+    """
+
+    def __init__(self, namespace: str, ttl: float = DEFAULT_TTL, directory_env: str | None = None):
+        """
+        Args:
+            namespace: The subdirectory holding this cache's entries.
+            ttl: Maximum age of an entry in seconds.
+            directory_env: Optional environment variable that, when set, names the
+                           directory to use instead of cache_root()/namespace.
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.directory_env = directory_env
+
+    def _directory(self) -> Path:
+        override = os.getenv(self.directory_env) if self.directory_env else None
+        if override:
+            return Path(override)
+        return cache_root() / self.namespace
+
+    def _path(self, key: str) -> Path:
+        return self._directory() / f"{key}.json"
+
+    def get(self, key: str):
+        """
+        Returns the cached value for `key`, or None if it is missing, expired or unreadable.
+        """
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            with path.open("r", encoding="utf-8") as f:
+                return json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, value) -> None:
+        """
+        Stores `value` under `key`. Write failures are ignored, as the cache is only an optimization.
+        """
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump({"value": value}, f)
+            # Atomic on POSIX and Windows, so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write cache entry %s: %s", path, e)
@@ -0,0 +1,139 @@
+# privacy_agent/utils/relevance.py
+"""
+Selects the sections of a privacy policy most relevant to a principle, so that
+only those are sent to the LLM instead of the full policy text.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Upper bound on the total length of the sections kept for one principle
+MAX_RELEVANT_CHARS = 4096
+
+# Sections are capped at this length, so text without recognizable headings is
+# still split into rankable pieces
+MAX_SECTION_CHARS = 1000
+_MAX_HEADING_CHARS = 80
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# "1. Data Collection", "2.3) Cookies", "IV. Your Rights"
+_NUMBERED_HEADING = re.compile(r"(?:\d+(?:\.\d+)*|[IVXLC]+)[.)]\s+\S")
+
+
+def _is_heading(line: str) -> bool:
+    """
+    Returns True if the (stripped, non-empty) line looks like a section heading:
+    numbered, ending with a colon, or a short Title Case line without closing punctuation.
+    """
+    if _NUMBERED_HEADING.match(line) or line.endswith(":"):
+        return True
+    if len(line) > _MAX_HEADING_CHARS or line[-1] in ".!?,;":
+        return False
+    words = [word for word in line.split() if len(word) > 3]
+    return bool(words) and all(word[0].isupper() for word in words)
+
+
+def _split_sections(policy_text: str) -> tuple[str, ...]:
+    """
+    Splits a policy into sections.
+
+    Text from extract_text_from_html has one line per block element and no blank
+    lines, so besides blank lines a section also ends before a heading-like line
+    that follows body text and once it reaches MAX_SECTION_CHARS. Runs of
+    heading-like lines (a title and its first heading, short list items) stay together.
+    """
+    sections = []
+    current = []
+    size = 0
+    after_body = False
+    for raw_line in policy_text.splitlines():
+        line = raw_line.strip()
+        heading = bool(line) and _is_heading(line)
+        if current and (not line or size >= MAX_SECTION_CHARS or (heading and after_body)):
+            sections.append("\n".join(current))
+            current = []
+            size = 0
+        if line:
+            current.append(line)
+            size += len(line) + 1
+            after_body = not heading
+    if current:
+        sections.append("\n".join(current))
+    return tuple(sections)
+
+
+@lru_cache(maxsize=16)
+def _index(policy_text: str):
+    """
+    Splits a policy into sections and builds their TF-IDF vectors.
+
+    Cached per policy text, so analyzing many principles against the same
+    policy splits and weights it only once.
+
+    Returns:
+        A (sections, idf, vectors) tuple, where vectors holds one L2-normalized
+        {term: weight} dict per section.
+    """
+    sections = _split_sections(policy_text)
+    term_counts = [Counter(_TOKEN.findall(section.lower())) for section in sections]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    n = len(sections)
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = []
+    for counts in term_counts:
+        weights = {term: count * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        vectors.append({term: w / norm for term, w in weights.items()})
+    return sections, idf, tuple(vectors)
+
+
+def select_relevant_sections(
+    policy_text: str,
+    query: str,
+    max_chars: int = MAX_RELEVANT_CHARS,
+    min_sections: int = 2,
+) -> str:
+    """
+    Returns the sections of `policy_text` most similar to `query`.
+
+    Sections are the blocks of the policy between blank lines and heading-like
+    lines (see _split_sections). They are ranked by TF-IDF cosine similarity to
+    the query and kept, best first, while their combined length stays within
+    max_chars. The kept sections are returned in their original order.
+
+    Args:
+        policy_text: The full privacy policy text.
+        query: The text to rank sections against (e.g. the principle name and explanation).
+        max_chars: The maximum combined length of the kept sections.
+        min_sections: If fewer sections than this are kept, the full text is returned.
+
+    Returns:
+        The relevant sections joined by blank lines, or the full policy text if it
+        is already short enough or too few sections match.
+    """
+    if len(policy_text) <= max_chars:
+        return policy_text
+
+    sections, idf, vectors = _index(policy_text)
+    query_counts = Counter(_TOKEN.findall(query.lower()))
+    query_weights = {term: count * idf[term] for term, count in query_counts.items() if term in idf}
+    if not query_weights:
+        return policy_text
+
+    scores = [sum(w * vector.get(term, 0.0) for term, w in query_weights.items()) for vector in vectors]
+    chosen = []
+    total = 0
+    for i in sorted(range(len(sections)), key=scores.__getitem__, reverse=True):
+        if scores[i] <= 0:
+            break
+        length = len(sections[i]) + 2  # including the blank-line separator
+        if total + length > max_chars:
+            continue
+        chosen.append(i)
+        total += length
+
+    if len(chosen) < min_sections:
+        return policy_text
+    return "\n\n".join(sections[i] for i in sorted(chosen))
@@ -1,11 +1,104 @@
 # privacy_agent/utils/web_parser.py
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import lxml.html
+from lxml import etree
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from privacy_agent.utils.cache import DiskCache, make_key
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never part of the policy itself
+_NON_CONTENT_TAGS = ("script", "style", "noscript", "nav", "footer")
+
+# Script and style blocks, removed before parsing so the parser never tokenizes
+# them (they are often most of a page's bytes); an HTML parser also ends these
+# elements at the first matching end tag
+_SCRIPT_STYLE_BLOCK = re.compile(r"<(script|style)(?=[\s/>])[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+# A whitespace run containing a line break or a double space (which usually
+# separates headlines or menu items run together on one line); each such run
+# becomes a single newline
+_TEXT_BREAK = re.compile(r"\s*(?:  |[\n\r\v\f\x1c-\x1e\x85\u2028\u2029])\s*")
+
+# Fetched pages with their ETag / Last-Modified validators. Entries are revalidated
+# with a conditional GET, so they can be kept much longer than the server's max-age.
+_page_cache = DiskCache("policy_pages", directory_env="PRIVACY_AGENT_POLICY_CACHE_DIR")
+
+# Policies rarely change, so a page fetched within this many seconds is reused
+# without contacting the server at all
+POLICY_FRESHNESS = 24 * 60 * 60
+
+# Extracted text for recently parsed pages, keyed by the SHA-1 of the HTML
+_EXTRACTED_CACHE_SIZE = 32
+_extracted_text = OrderedDict()
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Bytes read from a streamed response body per parser feed
+_STREAM_CHUNK_SIZE = 32 * 1024
+
+# (connect, read) timeouts in seconds
+_TIMEOUT = (3.05, 10)
+
+# Responses that cannot be a usable policy page are not parsed at all
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+
+# Default number of pages fetch_urls downloads at once; matches the session's pool size
+MAX_FETCH_WORKERS = 16
+
+def _make_session() -> requests.Session:
+    """
+    Builds the shared HTTP session.
+
+    Connections are kept alive and pooled per host, compressed responses are
+    requested (br only when a brotli decoder is installed), and connection
+    errors and 429/5xx responses are retried with backoff.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': _USER_AGENT,
+        'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+    })
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+_session = _make_session()
+
+def _request_headers(cached: dict | None) -> dict:
+    """Returns the per-request headers: the validators of a cached entry, for a conditional GET."""
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers['If-None-Match'] = cached["etag"]
+        if cached.get("last_modified"):
+            headers['If-Modified-Since'] = cached["last_modified"]
+    return headers
+
+def _is_fresh(cached: dict | None) -> bool:
+    """Returns True if a cached page entry was fetched or revalidated within POLICY_FRESHNESS."""
+    return cached is not None and time.time() - cached.get("fetched_at", 0) < POLICY_FRESHNESS
 
 def fetch_url_content(url: str) -> str | None:
     """
     Fetches the HTML content from the given URL.
 
+    A page fetched within POLICY_FRESHNESS is returned from the cache. An older one
+    is revalidated with If-None-Match / If-Modified-Since; if the server answers
+    304 Not Modified, the cached HTML is returned.
+
     Args:
         url: The URL to fetch.
 
@@ -13,20 +106,119 @@ def fetch_url_content(url: str) -> str | None:
         The HTML content as a string, or None if an error occurs.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        cache_key = make_key(url)
+        cached = _page_cache.get(cache_key)
+        if _is_fresh(cached):
+            return cached["html"]
+        headers = _request_headers(cached)
+
+        response = _session.get(url, headers=headers, timeout=_TIMEOUT)
+        if response.status_code == 304 and cached:
+            _page_cache.set(cache_key, {**cached, "fetched_at": time.time()})
+            return cached["html"]
         response.raise_for_status()  # Raise an exception for HTTP errors
+
+        _page_cache.set(cache_key, {
+            "html": response.text,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "fetched_at": time.time(),
+        })
         return response.text
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL {url}: {e}")
+        logger.warning("Error fetching URL %s: %s", url, e)
+        return None
+
+def fetch_urls(urls: list[str], max_workers: int = MAX_FETCH_WORKERS) -> list[str | None]:
+    """
+    Fetches several URLs concurrently with fetch_url_content.
+
+    The downloads are I/O-bound, so a thread pool over the shared session brings
+    the total time down to roughly that of the slowest page.
+
+    Args:
+        urls: The URLs to fetch.
+        max_workers: The maximum number of concurrent downloads.
+
+    Returns:
+        The HTML content of each URL (None where fetching failed), in the same order as urls.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(executor.map(fetch_url_content, urls))
+
+def fetch_and_extract(url: str) -> str | None:
+    """
+    Fetches the given URL and returns its extracted text, parsing the page while it downloads.
+
+    The response body is streamed into lxml's incremental parser, so parsing
+    overlaps with the download and the page is never held as one decoded string.
+    The extracted text (not the HTML) is cached, reused and revalidated like the
+    HTML in fetch_url_content, so cache hits skip parsing as well.
+
+    Args:
+        url: The URL to fetch.
+
+    Non-HTML responses (by Content-Type, or binary content), and pages larger
+    than MAX_PAGE_BYTES, are not parsed and give an empty text.
+
+    Returns:
+        The extracted plain text (as extract_text_from_html would return it), or
+        None if the page could not be fetched.
+    """
+    cache_key = make_key("text", url)
+    cached = _page_cache.get(cache_key)
+    if _is_fresh(cached):
+        return cached["text"]
+    try:
+        with _session.get(url, headers=_request_headers(cached), timeout=_TIMEOUT, stream=True) as response:
+            if response.status_code == 304 and cached:
+                _page_cache.set(cache_key, {**cached, "fetched_at": time.time()})
+                return cached["text"]
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_type and not content_type.startswith(_HTML_CONTENT_TYPES):
+                logger.info("Skipping %s: not an HTML page (%s)", url, content_type)
+                return ""
+            if int(response.headers.get('Content-Length') or 0) > MAX_PAGE_BYTES:
+                logger.info("Skipping %s: page larger than %d bytes", url, MAX_PAGE_BYTES)
+                return ""
+
+            # An explicit charset header wins; otherwise lxml detects it from the page
+            parser = lxml.html.HTMLParser(encoding=response.encoding if "charset=" in content_type else None)
+            received = 0
+            for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                if not received and b"\x00" in chunk:
+                    logger.info("Skipping %s: binary content", url)
+                    return ""
+                received += len(chunk)
+                if received > MAX_PAGE_BYTES:
+                    logger.info("Skipping %s: page larger than %d bytes", url, MAX_PAGE_BYTES)
+                    return ""
+                parser.feed(chunk)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except requests.exceptions.RequestException as e:
+        logger.warning("Error fetching URL %s: %s", url, e)
         return None
 
+    try:
+        text = _tree_text(parser.close())
+    except Exception as e:
+        logger.warning("Error extracting text from HTML: %s", e)
+        return ""
+    _page_cache.set(cache_key, {"text": text, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()})
+    return text
+
 def extract_text_from_html(html_content: str) -> str:
     """
     Extracts clean text content from HTML.
 
+    Results for the most recently parsed pages are memoized by the SHA-1 of the
+    HTML, so re-extracting an unchanged page skips parsing.
+
     Args:
         html_content: The HTML content as a string.
 
@@ -35,27 +227,44 @@ def extract_text_from_html(html_content: str) -> str:
     """
     if not html_content:
         return ""
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
+    digest = hashlib.sha1(html_content.encode("utf-8", "surrogatepass")).hexdigest()
+    text = _extracted_text.get(digest)
+    if text is not None:
+        _extracted_text.move_to_end(digest)
+        return text
+    text = _extract_text(html_content)
+    if text:
+        _extracted_text[digest] = text
+        if len(_extracted_text) > _EXTRACTED_CACHE_SIZE:
+            _extracted_text.popitem(last=False)
+    return text
 
-        # Get text
-        text = soup.get_text()
+def _extract_text(html_content: str) -> str:
+    """Parses `html_content` and returns its cleaned text (see extract_text_from_html)."""
+    html_content = _SCRIPT_STYLE_BLOCK.sub("", html_content)
+    if not html_content or html_content.isspace():
+        return ""
+    try:
+        try:
+            tree = lxml.html.fromstring(html_content)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            tree = lxml.html.fromstring(html_content.encode("utf-8"))
 
-        # Break into lines and remove leading/trailing space on each
-        lines = (line.strip() for line in text.splitlines())
-        # Break multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        # Drop blank lines
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        return text
+        return _tree_text(tree)
     except Exception as e:
-        print(f"Error extracting text from HTML: {e}")
+        logger.warning("Error extracting text from HTML: %s", e)
         return ""
 
+def _tree_text(tree) -> str:
+    """Returns the cleaned text of a parsed lxml.html tree, without its non-content elements."""
+    # Remove script/style elements and site navigation/footers (keeping the text after them)
+    # in a single pass over the tree
+    etree.strip_elements(tree, *_NON_CONTENT_TAGS, with_tail=False)
+
+    # One line per line or phrase, stripped, without blank lines, in a single C-level pass
+    return _TEXT_BREAK.sub("\n", tree.text_content()).strip()
+
 if __name__ == '__main__':
     # Example usage (for testing this module directly)
     test_url = "https://termly.io/html_document/website-privacy-policy-template-text-format/" # Example privacy policy
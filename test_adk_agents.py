@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 """
 Simple test script to verify that the Privacy Assessment Agent components are working correctly.
-This script uses the ADK Runner to test each agent individually.
+This script uses the ADK Runner to test each agent individually. Run it with pytest
+(the Runner is created once per module), or directly as a script.
 """
 import os
+import sys
+import pytest
 from dotenv import load_dotenv
 import google.generativeai as genai
 from google.adk.runners import Runner
@@ -15,35 +18,7 @@ from privacy_agent.agents.compliance_assessor_agent import ComplianceAssessorAge
 
 # Load environment variables
 load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
 
-if not api_key:
-    print("ERROR: GOOGLE_API_KEY not found in environment.")
-    exit(1)
-
-print(f"API Key found: {api_key[:5]}...{api_key[-5:]}")
-
-# Configure genai with the API key
-genai.configure(api_key=api_key)
-
-# Create a runner
-runner = Runner()
-
-# Test RegulationUnderstandingAgent
-print("\n=== Testing RegulationUnderstandingAgent ===")
-try:
-    regulation_agent = RegulationUnderstandingAgent(name="TestRegulationUnderstander")
-    regulation_result = runner.run(
-        agent=regulation_agent,
-        inputs={"user_input": "Explain the principle of Data Minimization"}
-    )
-    print(f"Regulation Understanding Result: {regulation_result}")
-    print("RegulationUnderstandingAgent test PASSED!")
-except Exception as e:
-    print(f"RegulationUnderstandingAgent test FAILED: {e}")
-
-# Test PolicyAnalyzerAgent
-print("\n=== Testing PolicyAnalyzerAgent ===")
 SAMPLE_POLICY_TEXT = """
 Our Privacy Policy
 Effective Date: January 1, 2024
@@ -56,7 +31,39 @@ Effective Date: January 1, 2024
    For newsletter signup, only your email is required.
 4. User Rights: You can unsubscribe at any time. You can request access to or deletion of your data.
 """
-try:
+
+SAMPLE_ANALYSIS = """
+Principle: Data Minimization
+Relevant Excerpt(s):
+"Data Minimization: We strive to collect only the data necessary for the stated purposes. For newsletter signup, only your email is required."
+Analysis:
+The policy explicitly addresses the principle of data minimization by stating that they strive to collect only necessary data for stated purposes. They provide a specific example of minimization by noting that for newsletter signup, only an email address is required.
+"""
+
+@pytest.fixture(scope="module")
+def runner():
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        pytest.skip("GOOGLE_API_KEY not found in environment.")
+    print(f"API Key found: {api_key[:5]}...{api_key[-5:]}")
+
+    # Configure genai with the API key
+    genai.configure(api_key=api_key)
+
+    # One runner shared by the three agent tests
+    return Runner()
+
+def test_regulation_understanding_agent(runner):
+    print("\n=== Testing RegulationUnderstandingAgent ===")
+    regulation_agent = RegulationUnderstandingAgent(name="TestRegulationUnderstander")
+    regulation_result = runner.run(
+        agent=regulation_agent,
+        inputs={"user_input": "Explain the principle of Data Minimization"}
+    )
+    print(f"Regulation Understanding Result: {regulation_result}")
+
+def test_policy_analyzer_agent(runner):
+    print("\n=== Testing PolicyAnalyzerAgent ===")
     analyzer_agent = PolicyAnalyzerAgent(name="TestPolicyAnalyzer")
     analyzer_result = runner.run(
         agent=analyzer_agent,
@@ -67,20 +74,9 @@ try:
         }
     )
     print(f"Policy Analysis Result: {analyzer_result}")
-    print("PolicyAnalyzerAgent test PASSED!")
-except Exception as e:
-    print(f"PolicyAnalyzerAgent test FAILED: {e}")
 
-# Test ComplianceAssessorAgent
-print("\n=== Testing ComplianceAssessorAgent ===")
-SAMPLE_ANALYSIS = """
-Principle: Data Minimization
-Relevant Excerpt(s):
-"Data Minimization: We strive to collect only the data necessary for the stated purposes. For newsletter signup, only your email is required."
-Analysis:
-The policy explicitly addresses the principle of data minimization by stating that they strive to collect only necessary data for stated purposes. They provide a specific example of minimization by noting that for newsletter signup, only an email address is required.
-"""
-try:
+def test_compliance_assessor_agent(runner):
+    print("\n=== Testing ComplianceAssessorAgent ===")
     assessor_agent = ComplianceAssessorAgent(name="TestComplianceAssessor")
     assessor_result = runner.run(
         agent=assessor_agent,
@@ -92,8 +88,6 @@ try:
         }
     )
     print(f"Compliance Assessment Result: {assessor_result}")
-    print("ComplianceAssessorAgent test PASSED!")
-except Exception as e:
-    print(f"ComplianceAssessorAgent test FAILED: {e}")
 
-print("\nAll tests completed!")
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 """
 Simple test script to verify that the Privacy Assessment Agent is working correctly.
+Run it with pytest (the agents are built once per module), or directly as a script.
 """
 import os
+import sys
+import pytest
 from dotenv import load_dotenv
 from privacy_agent.agents.policy_analyzer_agent import PolicyAnalyzerAgent
 from privacy_agent.agents.compliance_assessor_agent import ComplianceAssessorAgent
@@ -10,22 +13,7 @@ from privacy_agent.agents.regulation_understanding_agent import RegulationUnders
 
 # Load environment variables
 load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
 
-if not api_key:
-    print("ERROR: GOOGLE_API_KEY not found in environment.")
-    exit(1)
-
-print(f"API Key found: {api_key[:5]}...{api_key[-5:]}")
-
-# Test the RegulationUnderstandingAgent
-print("\n=== Testing RegulationUnderstandingAgent ===")
-regulation_agent = RegulationUnderstandingAgent(name="TestRegulationUnderstander")
-regulation_result = regulation_agent.invoke(regulation_name="Data Minimization")
-print(f"Regulation Understanding Result: {regulation_result}")
-
-# Test the PolicyAnalyzerAgent
-print("\n=== Testing PolicyAnalyzerAgent ===")
 SAMPLE_POLICY_TEXT = """
 Our Privacy Policy
 Effective Date: January 1, 2024
@@ -38,12 +26,7 @@ Effective Date: January 1, 2024
    For newsletter signup, only your email is required.
 4. User Rights: You can unsubscribe at any time. You can request access to or deletion of your data.
 """
-analyzer_agent = PolicyAnalyzerAgent(name="TestPolicyAnalyzer")
-analyzer_result = analyzer_agent.invoke(policy_text=SAMPLE_POLICY_TEXT, principle_name="Data Minimization")
-print(f"Policy Analysis Result: {analyzer_result}")
 
-# Test the ComplianceAssessorAgent
-print("\n=== Testing ComplianceAssessorAgent ===")
 SAMPLE_ANALYSIS = """
 Principle: Data Minimization
 Relevant Excerpt(s):
@@ -51,12 +34,45 @@ Relevant Excerpt(s):
 Analysis:
 The policy explicitly addresses the principle of data minimization by stating that they strive to collect only necessary data for stated purposes. They provide a specific example of minimization by noting that for newsletter signup, only an email address is required.
 """
-assessor_agent = ComplianceAssessorAgent(name="TestComplianceAssessor")
-assessor_result = assessor_agent.invoke(
-    principle_name="Data Minimization",
-    policy_excerpt="Data Minimization: We strive to collect only the data necessary for the stated purposes. For newsletter signup, only your email is required.",
-    analysis=SAMPLE_ANALYSIS
-)
-print(f"Compliance Assessment Result: {assessor_result}")
-
-print("\nAll tests completed successfully!")
+
+@pytest.fixture(scope="module")
+def api_key():
+    key = os.getenv("GOOGLE_API_KEY")
+    if not key:
+        pytest.skip("GOOGLE_API_KEY not found in environment.")
+    print(f"API Key found: {key[:5]}...{key[-5:]}")
+    return key
+
+@pytest.fixture(scope="module")
+def regulation_agent(api_key):
+    return RegulationUnderstandingAgent(name="TestRegulationUnderstander")
+
+@pytest.fixture(scope="module")
+def analyzer_agent(api_key):
+    return PolicyAnalyzerAgent(name="TestPolicyAnalyzer")
+
+@pytest.fixture(scope="module")
+def assessor_agent(api_key):
+    return ComplianceAssessorAgent(name="TestComplianceAssessor")
+
+def test_regulation_understanding_agent(regulation_agent):
+    print("\n=== Testing RegulationUnderstandingAgent ===")
+    regulation_result = regulation_agent.invoke(regulation_name="Data Minimization")
+    print(f"Regulation Understanding Result: {regulation_result}")
+
+def test_policy_analyzer_agent(analyzer_agent):
+    print("\n=== Testing PolicyAnalyzerAgent ===")
+    analyzer_result = analyzer_agent.invoke(policy_text=SAMPLE_POLICY_TEXT, principle_name="Data Minimization")
+    print(f"Policy Analysis Result: {analyzer_result}")
+
+def test_compliance_assessor_agent(assessor_agent):
+    print("\n=== Testing ComplianceAssessorAgent ===")
+    assessor_result = assessor_agent.invoke(
+        principle_name="Data Minimization",
+        policy_excerpt="Data Minimization: We strive to collect only the data necessary for the stated purposes. For newsletter signup, only your email is required.",
+        analysis=SAMPLE_ANALYSIS
+    )
+    print(f"Compliance Assessment Result: {assessor_result}")
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
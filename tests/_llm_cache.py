@@ -0,0 +1,98 @@
+"""
+Record/replay cache for the live Gemini calls made by the agent integration tests.
+
+Responses are read from tests/llm_responses.json, keyed by the SHA-256 of the
+model name, prompt and generation arguments. No recordings are committed yet, so
+the integration tests call the API when GEMINI_API_KEY (or GOOGLE_API_KEY) is set
+and are skipped otherwise. With a key, a prompt that has no recording is sent to
+the API; set PYTEST_RECORD_LLM=1 as well to write those responses to the file,
+which can then be committed so the tests replay without a key.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+RECORD = os.getenv("PYTEST_RECORD_LLM") == "1"
+RESPONSES_PATH = Path(__file__).with_name("llm_responses.json")
+
+
+class CachedResponse:
+    """The part of a generate_content response the agents read."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMResponseCache:
+    """Recorded response texts, loaded once per test session."""
+
+    def __init__(self, path: Path = RESPONSES_PATH, live: bool = False, record: bool = RECORD):
+        self.path = path
+        # Whether a prompt without a recording may be sent to the API
+        self.live = live
+        self.record = record and live
+        try:
+            self.responses = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.responses = {}
+        self._dirty = False
+
+    def wrap(self, model):
+        """Returns `model` with generate_content / generate_content_async served from this cache."""
+        return _RecordingModel(model, self)
+
+    def key(self, model, prompt, kwargs) -> str:
+        model_name = getattr(model, "model", None) or getattr(model, "model_name", "")
+        payload = json.dumps([str(model_name), prompt, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str):
+        """Returns the recorded response for `key`, or None to call the API; skips the test if neither is possible."""
+        if key in self.responses:
+            return CachedResponse(self.responses[key])
+        if not self.live:
+            pytest.skip("No recorded LLM response for this prompt and no API key to call the API with.")
+        return None
+
+    def store(self, key: str, response) -> None:
+        """Records a live response when recording is on."""
+        if not self.record:
+            return
+        self.responses[key] = response.text
+        self._dirty = True
+
+    def save(self) -> None:
+        if self._dirty:
+            self.path.write_text(json.dumps(self.responses, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+class _RecordingModel:
+    """Proxy for an agent's model that replays recorded responses before calling the API."""
+
+    def __init__(self, model, cache: LLMResponseCache):
+        self._model = model
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def generate_content(self, prompt, **kwargs):
+        key = self._cache.key(self._model, prompt, kwargs)
+        cached = self._cache.lookup(key)
+        if cached is not None:
+            return cached
+        response = self._model.generate_content(prompt, **kwargs)
+        self._cache.store(key, response)
+        return response
+
+    async def generate_content_async(self, prompt, **kwargs):
+        key = self._cache.key(self._model, prompt, kwargs)
+        cached = self._cache.lookup(key)
+        if cached is not None:
+            return cached
+        response = await self._model.generate_content_async(prompt, **kwargs)
+        self._cache.store(key, response)
+        return response
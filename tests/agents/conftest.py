@@ -0,0 +1,117 @@
+import pytest
+
+from privacy_agent.agents.compliance_assessor_agent import ComplianceAssessorAgent
+from privacy_agent.agents.policy_analyzer_agent import PolicyAnalyzerAgent
+from privacy_agent.agents.policy_fetcher_agent import PolicyFetcherAgent
+from privacy_agent.agents.regulation_understanding_agent import RegulationUnderstandingAgent
+from privacy_agent.data_structures import AssessmentResult, ComplianceAssessmentResult, PolicyAnalysisResult
+from tests._llm_cache import LLMResponseCache
+
+# Agents are built once per session and shared by the tests that use them.
+# Tests that replace an agent's model or methods construct their own instance.
+
+@pytest.fixture(scope="session")
+def llm_cache(gemini_api_key):
+    """Recorded LLM responses for the integration tests (see tests/_llm_cache.py)."""
+    cache = LLMResponseCache(live=bool(gemini_api_key))
+    yield cache
+    cache.save()
+
+def _live_or_replayed(agent, llm_cache, gemini_api_key, skip_reason):
+    """Replays the agent's recorded LLM calls and makes the rest live; skips if there is neither an API key nor a recording."""
+    if not gemini_api_key and not llm_cache.responses:
+        pytest.skip(skip_reason)
+    agent._client = llm_cache.wrap(agent._client)
+    return agent
+
+@pytest.fixture(scope="session")
+def assessor_agent(llm_cache, gemini_api_key):
+    """Fixture to create an instance of ComplianceAssessorAgent."""
+    return _live_or_replayed(
+        ComplianceAssessorAgent(name="TestComplianceAssessor"), llm_cache, gemini_api_key,
+        "GEMINI_API_KEY not found, skipping ComplianceAssessorAgent integration tests.",
+    )
+
+@pytest.fixture(scope="session")
+def analyzer_agent_fixture(llm_cache, gemini_api_key):
+    """Fixture to create an instance of PolicyAnalyzerAgent."""
+    return _live_or_replayed(
+        PolicyAnalyzerAgent(name="TestPolicyAnalyzer"), llm_cache, gemini_api_key,
+        "GEMINI_API_KEY not found, skipping PolicyAnalyzerAgent integration tests.",
+    )
+
+@pytest.fixture(scope="session")
+def understanding_agent(llm_cache, gemini_api_key):
+    """Fixture to create an instance of RegulationUnderstandingAgent."""
+    return _live_or_replayed(
+        RegulationUnderstandingAgent(name="TestRegulationUnderstandingAgent", model_name="gemini-1.5-flash-latest"),
+        llm_cache,
+        gemini_api_key,
+        "GEMINI_API_KEY not found, skipping RegulationUnderstandingAgent integration tests.",
+    )
+
+@pytest.fixture(scope="session")
+def fetcher_agent():
+    """Fixture to create an instance of PolicyFetcherAgent."""
+    return PolicyFetcherAgent()
+
+# Sample outputs of the analysis and assessment agents, for the report generator tests
+ASSESSMENT_RESULTS_DATA = (
+    {
+        "principle_name": "Data Minimization",
+        "principle_explanation": "Collect only data that is strictly necessary for the specified purpose.",
+        "policy_analysis": {
+            "summary": "The policy mentions collecting email addresses for newsletters and expresses an intention to minimize data collection.",
+            "relevant_excerpts": [
+                {"excerpt": "We collect your email address when you sign up for our newsletter.", "location_context": "Section 1"},
+                {"excerpt": "We try not to collect more data than we need.", "location_context": "Section 1"}
+            ]
+        },
+        "compliance_assessment": {
+            "level": "Medium",
+            "justification": "The policy states an intention for data minimization but lacks specifics on what 'need' means.",
+            "suggestions": ["Specify the exact data points collected and why each is necessary.", "Define retention periods."]
+        }
+    },
+    {
+        "principle_name": "Data Security",
+        "principle_explanation": "Implement appropriate technical and organizational measures to protect data.",
+        "policy_analysis": {
+            "summary": "The policy makes a general statement about 'industry standard' security.",
+            "relevant_excerpts": [
+                {"excerpt": "Our security is industry standard.", "location_context": "Section 4"}
+            ]
+        },
+        "compliance_assessment": {
+            "level": "Low",
+            "justification": "'Industry standard' is vague and provides no concrete information on security measures.",
+            "suggestions": ["Detail specific security measures (e.g., encryption, access controls).", "Mention security certifications or audits if applicable."]
+        }
+    },
+    {
+        "principle_name": "Transparency",
+        "principle_explanation": "Be clear and open with individuals about how their personal data is collected, used, and shared.",
+        "policy_analysis": {
+            "summary": "The policy is very brief and lacks detailed information on data usage and sharing.",
+            "relevant_excerpts": []
+        },
+        "compliance_assessment": {
+            "level": "Low",
+            "justification": "Insufficient detail on data processing activities. Does not clearly state all purposes or sharing practices.",
+            "suggestions": ["Provide a comprehensive list of data uses.", "Clearly list any third-party sharing.", "Explain user rights more thoroughly."]
+        }
+    }
+)
+
+@pytest.fixture(scope="session")
+def assessment_results():
+    """ASSESSMENT_RESULTS_DATA as AssessmentResult objects, built once per session."""
+    return tuple(
+        AssessmentResult(
+            principle_name=item["principle_name"],
+            principle_explanation=item["principle_explanation"],
+            policy_analysis=PolicyAnalysisResult(**item["policy_analysis"]),
+            compliance_assessment=ComplianceAssessmentResult(**item["compliance_assessment"]),
+        )
+        for item in ASSESSMENT_RESULTS_DATA
+    )
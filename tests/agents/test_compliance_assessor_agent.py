@@ -1,92 +1,134 @@
+import logging
+
 import pytest
-import os
-from dotenv import load_dotenv
 
 from privacy_agent.agents.compliance_assessor_agent import ComplianceAssessorAgent
+from tests.conftest import MockContext
 
-load_dotenv()
-
-SAMPLE_PRINCIPLE_EXPLANATION_MINIMIZATION = (
-    "Data Minimization is a core privacy principle stating that organizations should only collect, "
-    "use, or retain personal data that is necessary to accomplish a specified and legitimate purpose. "
-    "Excessive data collection should be avoided, and data should not be kept longer than needed."
-)
+logger = logging.getLogger(__name__)
 
-SAMPLE_PRINCIPLE_EXPLANATION_SECURITY = (
-    "Data Security is about protecting data from unauthorized access, use, disclosure, alteration, or destruction."
-)
+# Error returned when the context lacks the principle name or the analysis
+MISSING_INPUTS_ERROR = "Error: Missing required inputs: principle_name and analysis must be provided in context."
 
 SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION = {
-    "analysis": "The policy mentions data minimization in section 3, stating they collect only necessary data, e.g., email for newsletters.",
-    "excerpts": [
-        "We strive to collect only the data necessary for the stated purposes.",
-        "For newsletter signup, only your email is required."
+    "summary": "The policy mentions data minimization in section 3, stating they collect only necessary data, e.g., email for newsletters.",
+    "relevant_excerpts": [
+        {"excerpt": "We strive to collect only the data necessary for the stated purposes.", "location_context": "Section 3"},
+        {"excerpt": "For newsletter signup, only your email is required.", "location_context": "Section 3"},
     ]
 }
 
 SAMPLE_POLICY_ANALYSIS_NOT_ADDRESSED_SECURITY = {
-    "analysis": "The policy does not appear to address data security measures explicitly.",
-    "excerpts": []
+    "summary": "The policy does not appear to address data security measures explicitly.",
+    "relevant_excerpts": []
 }
 
-@pytest.fixture
-def assessor_agent():
-    """Fixture to create an instance of ComplianceAssessorAgent."""
-    if not os.getenv("GEMINI_API_KEY"):
-        pytest.skip("GEMINI_API_KEY not found, skipping ComplianceAssessorAgent integration tests.")
-    return ComplianceAssessorAgent(name="TestComplianceAssessor")
+def _assessment_context(principle_name, policy_analysis):
+    """Builds the assessor's context from a PolicyAnalyzerAgent result."""
+    return MockContext(
+        principle_name=principle_name,
+        policy_excerpt="\n".join(item["excerpt"] for item in policy_analysis["relevant_excerpts"]),
+        analysis=policy_analysis["summary"],
+    )
 
+@pytest.mark.integration
 def test_compliance_assessor_principle_addressed(assessor_agent):
     """Tests compliance assessment when the principle is addressed in the policy analysis."""
-    print("\n--- Test Case: Principle Addressed (Minimization) ---")
+    logger.debug("--- Test Case: Principle Addressed (Minimization) ---")
     result = assessor_agent.invoke(
-        principle_explanation=SAMPLE_PRINCIPLE_EXPLANATION_MINIMIZATION,
-        policy_analysis=SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION
+        "Assess compliance with data minimization",
+        _assessment_context("Data Minimization", SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION),
     )
-    print(f"LLM Raw Output: {result}")
+    logger.debug("LLM Raw Output: %s", result)
 
-    assert "error" not in result, f"LLM call resulted in an error: {result.get('error')}"
-    assert result.get("compliance_level") != "Could not parse from LLM output.", "Compliance level was not parsed."
-    assert isinstance(result.get("compliance_level"), str) and len(result["compliance_level"].strip()) > 0, "Compliance level is empty or invalid."
-    assert isinstance(result.get("justification"), str) and len(result["justification"].strip()) > 0, "Justification is empty or invalid."
-    assert isinstance(result.get("suggestions"), list), "Suggestions should be a list."
+    assert isinstance(result, str) and len(result.strip()) > 0, "Assessment is empty or invalid."
+    assert not result.startswith("Error:"), f"LLM call resulted in an error: {result}"
+    assert "Compliance Level" in result, "Assessment should state a compliance level."
 
+@pytest.mark.integration
 def test_compliance_assessor_principle_not_addressed(assessor_agent):
     """Tests compliance assessment when policy analysis indicates the principle is not addressed."""
-    print("\n--- Test Case: Principle Not Addressed (Security) ---")
+    logger.debug("--- Test Case: Principle Not Addressed (Security) ---")
     result = assessor_agent.invoke(
-        principle_explanation=SAMPLE_PRINCIPLE_EXPLANATION_SECURITY,
-        policy_analysis=SAMPLE_POLICY_ANALYSIS_NOT_ADDRESSED_SECURITY
+        "Assess compliance with data security",
+        _assessment_context("Data Security", SAMPLE_POLICY_ANALYSIS_NOT_ADDRESSED_SECURITY),
     )
-    print(f"LLM Raw Output: {result}")
-
-    assert "error" not in result, f"LLM call resulted in an error: {result.get('error')}"
-    assert result.get("compliance_level") != "Could not parse from LLM output.", "Compliance level was not parsed."
-    assert isinstance(result.get("compliance_level"), str) and len(result["compliance_level"].strip()) > 0
-    assert isinstance(result.get("justification"), str) and len(result["justification"].strip()) > 0
-    assert isinstance(result.get("suggestions"), list)
-
-def test_compliance_assessor_invalid_inputs(assessor_agent):
-    """Tests agent's handling of invalid or empty inputs."""
-    print("\n--- Test Case: Invalid Inputs ---")
-    
-    invalid_explanation_result = assessor_agent.invoke(
-        principle_explanation="", 
-        policy_analysis=SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION
-    )
-    assert "error" in invalid_explanation_result, "Expected error for empty principle explanation."
-    assert "Invalid or empty principle explanation" in invalid_explanation_result["error"]
+    logger.debug("LLM Raw Output: %s", result)
 
-    invalid_analysis_result = assessor_agent.invoke(
-        principle_explanation=SAMPLE_PRINCIPLE_EXPLANATION_MINIMIZATION, 
-        policy_analysis={}
-    )
-    assert "error" in invalid_analysis_result, "Expected error for empty policy analysis."
-    assert "Invalid or incomplete policy analysis" in invalid_analysis_result["error"]
+    assert isinstance(result, str) and len(result.strip()) > 0, "Assessment is empty or invalid."
+    assert not result.startswith("Error:"), f"LLM call resulted in an error: {result}"
+    assert "Compliance Level" in result, "Assessment should state a compliance level."
+
+def test_compliance_assessor_invalid_inputs():
+    """Missing principle name or analysis is reported without calling the LLM."""
+    class MockModel:
+        def generate_content(self, prompt):
+            raise AssertionError("The LLM should not be called for invalid inputs.")
+
+    agent = ComplianceAssessorAgent(name="TestComplianceAssessorInvalid")
+    agent._client = MockModel()
+
+    missing_principle = _assessment_context("", SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION)
+    assert agent.invoke("Assess compliance", missing_principle) == MISSING_INPUTS_ERROR
+
+    missing_analysis = MockContext(principle_name="Data Minimization", analysis="")
+    assert agent.invoke("Assess compliance", missing_analysis) == MISSING_INPUTS_ERROR
+
+    assert agent.invoke("Assess compliance") == MISSING_INPUTS_ERROR
 
-    invalid_analysis_result_missing_keys = assessor_agent.invoke(
-        principle_explanation=SAMPLE_PRINCIPLE_EXPLANATION_MINIMIZATION, 
-        policy_analysis={"analysis": "some analysis"}
+def test_parse_suggestions_bullet_first():
+    """Bullet-first output is parsed into suggestions, with sub-bullets folded into their parent."""
+    text = (
+        "* State the purpose for each data field.\n"
+        "  - Explain why the phone number is needed.\n"
+        "* Define retention periods.\n"
+        "  for each category of data."
     )
-    assert "error" in invalid_analysis_result_missing_keys, "Expected error for policy analysis missing keys."
-    assert "Invalid or incomplete policy analysis" in invalid_analysis_result_missing_keys["error"]
+    assert ComplianceAssessorAgent._parse_suggestions(text) == [
+        "State the purpose for each data field. (sub-point: Explain why the phone number is needed.)",
+        "Define retention periods. for each category of data.",
+    ]
+
+def test_parse_suggestions_skips_header():
+    """A leading header line such as 'Suggestions:' is not treated as a suggestion."""
+    text = "Suggestions:\n- Limit cookie usage.\n- Document data minimization."
+    assert ComplianceAssessorAgent._parse_suggestions(text) == [
+        "Limit cookie usage.",
+        "Document data minimization.",
+    ]
+
+def test_parse_suggestions_plain_text_and_empty():
+    """Non-bullet text becomes a single suggestion; empty input yields no suggestions."""
+    assert ComplianceAssessorAgent._parse_suggestions("Add a data security section.") == [
+        "Add a data security section."
+    ]
+    assert ComplianceAssessorAgent._parse_suggestions("Suggestions:") == ["Suggestions:"]
+    assert ComplianceAssessorAgent._parse_suggestions("") == []
+
+def test_compliance_assessor_trivial_analysis_skips_llm():
+    """A 'not addressed' analysis is answered without calling the LLM."""
+    agent = ComplianceAssessorAgent(name="TestComplianceAssessorTrivial")
+    context = MockContext(principle_name="Data Security", analysis="Not addressed.")
+    result = agent.invoke("Assess compliance with data security", context)
+    assert result == ComplianceAssessorAgent._NOT_ADDRESSED_ASSESSMENT
+    assert result.startswith("1. Compliance Level: Not Addressed")
+
+def test_compliance_assessor_memoizes_identical_inputs():
+    """Repeated invocations with identical inputs reuse the first assessment."""
+    class MockResponse:
+        text = " 1. Compliance Level: High \n"
+
+    class MockModel:
+        calls = 0
+
+        def generate_content(self, prompt):
+            MockModel.calls += 1
+            return MockResponse()
+
+    agent = ComplianceAssessorAgent(name="TestComplianceAssessorMemo")
+    agent._client = MockModel()
+    context = _assessment_context("Data Minimization", SAMPLE_POLICY_ANALYSIS_ADDRESSED_MINIMIZATION)
+    first = agent.invoke("Assess compliance", context)
+    second = agent.invoke("Assess compliance", context)
+    assert first == second == "1. Compliance Level: High"
+    assert MockModel.calls == 1
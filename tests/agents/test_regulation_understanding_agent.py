@@ -1,53 +1,76 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
 import pytest
-import os
-from dotenv import load_dotenv
 
+from privacy_agent.agents import regulation_understanding_agent
 from privacy_agent.agents.regulation_understanding_agent import RegulationUnderstandingAgent
 
-load_dotenv()
-
-@pytest.fixture
-def understanding_agent():
-    """Fixture to create an instance of RegulationUnderstandingAgent."""
-    if not os.getenv("GEMINI_API_KEY"):
-        pytest.skip("GEMINI_API_KEY not found, skipping RegulationUnderstandingAgent integration tests.")
-    return RegulationUnderstandingAgent(name="TestRegulationUnderstandingAgent", model_name="gemini-1.5-flash-latest")
-
-def test_regulation_understanding_valid_principle_string(understanding_agent):
-    """Tests the agent with a valid principle name as a string input."""
-    test_principle = "Data Minimization"
-    print(f"\n--- Testing {understanding_agent.name} with principle: '{test_principle}' ---")
-    output = understanding_agent.invoke(test_principle)
-
-    assert "error" not in output, f"LLM call resulted in an error: {output.get('error')}"
-    assert "explanation" in output, "Output dictionary should contain an 'explanation' key."
-    assert isinstance(output["explanation"], str), "Explanation should be a string."
-    assert len(output["explanation"].strip()) > 0, "Explanation should not be empty."
-    print(f"Explanation received: {output['explanation'][:100]}...")
-
-def test_regulation_understanding_valid_principle_dict(understanding_agent):
-    """Tests the agent with a valid principle name as a dictionary input."""
-    test_principle_dict_input = {"principle": "Purpose Limitation"}
-    principle_name = test_principle_dict_input['principle']
-    print(f"\n--- Testing {understanding_agent.name} with principle (dict input): '{principle_name}' ---")
-    output = understanding_agent.invoke(test_principle_dict_input)
-
-    assert "error" not in output, f"LLM call resulted in an error: {output.get('error')}"
-    assert "explanation" in output, "Output dictionary should contain an 'explanation' key."
-    assert isinstance(output["explanation"], str), "Explanation should be a string."
-    assert len(output["explanation"].strip()) > 0, "Explanation should not be empty."
-    print(f"Explanation received: {output['explanation'][:100]}...")
-
-def test_regulation_understanding_invalid_input_none(understanding_agent):
-    """Tests the agent's response to None as input."""
-    print(f"\n--- Testing {understanding_agent.name} with invalid input (None) ---")
-    output = understanding_agent.invoke(None) # type: ignore
-    assert "error" in output, "Expected an error for None input."
-    assert "Invalid input_request type" in output["error"] or "Privacy principle/regulation name not provided" in output["error"]
-
-def test_regulation_understanding_invalid_input_empty_dict(understanding_agent):
-    """Tests the agent's response to an empty dictionary as input."""
-    print(f"\n--- Testing {understanding_agent.name} with invalid input (empty dict) ---")
-    output = understanding_agent.invoke({})
-    assert "error" in output, "Expected an error for empty dictionary input."
-    assert "Privacy principle/regulation name not provided" in output["error"]
+logger = logging.getLogger(__name__)
+
+# Returned, without calling the LLM, when the input names no principle
+MISSING_NAME_ERROR = "Error: Privacy principle/regulation name not provided."
+
+@pytest.mark.integration
+@pytest.mark.parametrize("principle", ["Data Minimization", "Purpose Limitation"])
+def test_regulation_understanding_valid_principle(understanding_agent, principle):
+    """Tests the agent with a valid principle name."""
+    logger.debug("--- Testing %s with principle: %r ---", understanding_agent.name, principle)
+    output = understanding_agent.invoke(principle, force_refresh=True)
+
+    assert isinstance(output, str), "Explanation should be a string."
+    assert not output.startswith("Error:"), f"LLM call resulted in an error: {output}"
+    assert len(output.strip()) > 0, "Explanation should not be empty."
+    logger.debug("Explanation received: %.100s...", output)
+
+@pytest.mark.parametrize("invalid_input", [None, {}, "", "   "], ids=["none", "empty_dict", "empty", "blank"])
+def test_regulation_understanding_invalid_input(mock_gemini, invalid_input):
+    """None, non-string or empty input is answered with an error string, without calling the LLM."""
+    agent = RegulationUnderstandingAgent(name="TestRegulationUnderstandingInvalid")
+    agent._client = mock_gemini
+
+    assert agent.invoke(invalid_input) == MISSING_NAME_ERROR # type: ignore
+    assert asyncio.run(agent.ainvoke(invalid_input)) == MISSING_NAME_ERROR # type: ignore
+    assert mock_gemini.prompts == []
+
+@pytest.mark.parametrize("principle", ["Data Minimization", "Purpose Limitation"])
+def test_regulation_understanding_explains_principle_with_mock(monkeypatch, tmp_path, mock_gemini, principle):
+    """Unit counterpart of test_regulation_understanding_valid_principle, answered by a mock Gemini."""
+    mock_gemini.text = f"  {principle} means ...  "
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(regulation_understanding_agent, "_recent_explanations", OrderedDict())
+    agent = RegulationUnderstandingAgent(name="TestRegulationUnderstandingMock")
+    agent._client = mock_gemini
+
+    assert agent.invoke(principle) == mock_gemini.text.strip()
+    assert f"'{principle}'" in mock_gemini.prompts[0]
+
+def test_regulation_understanding_caches_explanations(monkeypatch, tmp_path, mock_gemini):
+    """Explanations are served from the disk cache until force_refresh is requested."""
+    mock_gemini.text = "Collect only the data you need."
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(regulation_understanding_agent, "_recent_explanations", OrderedDict())
+    agent = RegulationUnderstandingAgent(name="TestRegulationUnderstandingCache")
+    agent._client = mock_gemini
+
+    assert agent.invoke("Data Minimization") == mock_gemini.text
+    assert agent.invoke("  data minimization ") == mock_gemini.text
+    assert len(mock_gemini.prompts) == 1
+    assert agent.invoke("Data Minimization", force_refresh=True) == mock_gemini.text
+    assert len(mock_gemini.prompts) == 2
+    assert list((tmp_path / "reg_explanations").glob("*.json"))
+
+def test_regulation_understanding_reuses_explanations_in_memory(monkeypatch, tmp_path, mock_gemini):
+    """A repeated principle is answered from memory without reading the disk cache."""
+    mock_gemini.text = "Tell people how their data is used."
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(regulation_understanding_agent, "_recent_explanations", OrderedDict())
+    agent = RegulationUnderstandingAgent(name="TestRegulationUnderstandingMemory")
+    agent._client = mock_gemini
+
+    assert agent.invoke("Transparency") == mock_gemini.text
+    monkeypatch.setattr(regulation_understanding_agent._explanation_cache, "get", lambda key: pytest.fail("disk cache read"))
+    assert agent.invoke("Transparency") == mock_gemini.text
+    assert asyncio.run(agent.ainvoke("transparency")) == mock_gemini.text
+    assert len(mock_gemini.prompts) == 1
@@ -1,113 +1,217 @@
+import logging
 import pytest
-import os
-from dotenv import load_dotenv
 from privacy_agent.agents.report_generator_agent import ReportGeneratorAgent
 from privacy_agent.data_structures import AssessmentResult, PolicyAnalysisResult, ComplianceAssessmentResult
 
-# Load environment variables for testing context if needed, or mock them
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Ensure GEMINI_API_KEY is available for tests that might make real API calls
-# For production tests, consider mocking the API calls.
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Warning: GEMINI_API_KEY not found. Real API calls in tests might fail.")
-    # pytest.skip("GEMINI_API_KEY not found, skipping integration tests", allow_module_level=True)
+# Sample policy matching the assessment_results fixture in conftest.py
+SAMPLE_POLICY_TEXT = """
+Privacy Policy for Sample Service
 
+1. Data Collection: We collect your email address when you sign up for our newsletter.
+We try not to collect more data than we need.
 
-def test_report_generator_agent_invoke():
+2. Data Usage: We use your email to send you newsletters and promotional offers.
+
+3. Data Sharing: We do not share your personal data with third parties without your consent,
+unless required by law.
+
+4. Data Security: Our security is industry standard.
+
+5. Your Rights: You can unsubscribe at any time.
+"""
+
+
+@pytest.mark.integration
+def test_report_generator_agent_invoke(gemini_api_key, assessment_results):
     """
     Tests the invoke method of the ReportGeneratorAgent.
     """
-    print("Testing ReportGeneratorAgent...")
+    if not gemini_api_key:
+        pytest.skip("GEMINI_API_KEY not found, skipping ReportGeneratorAgent integration test.")
+    logger.debug("Testing ReportGeneratorAgent...")
     report_agent = ReportGeneratorAgent()
 
-    # Sample data (mimicking outputs from previous agents)
-    sample_policy_text = """
-    Privacy Policy for Sample Service
-
-    1. Data Collection: We collect your email address when you sign up for our newsletter.
-    We try not to collect more data than we need.
-
-    2. Data Usage: We use your email to send you newsletters and promotional offers.
-
-    3. Data Sharing: We do not share your personal data with third parties without your consent,
-    unless required by law.
-
-    4. Data Security: Our security is industry standard.
-
-    5. Your Rights: You can unsubscribe at any time.
-    """
-
-    assessment_results_data = [
-        {
-            "principle_name": "Data Minimization",
-            "principle_explanation": "Collect only data that is strictly necessary for the specified purpose.",
-            "policy_analysis": {
-                "summary": "The policy mentions collecting email addresses for newsletters and expresses an intention to minimize data collection.",
-                "relevant_excerpts": [
-                    {"excerpt": "We collect your email address when you sign up for our newsletter.", "location_context": "Section 1"},
-                    {"excerpt": "We try not to collect more data than we need.", "location_context": "Section 1"}
-                ]
-            },
-            "compliance_assessment": {
-                "level": "Medium",
-                "justification": "The policy states an intention for data minimization but lacks specifics on what 'need' means.",
-                "suggestions": ["Specify the exact data points collected and why each is necessary.", "Define retention periods."]
-            }
-        },
-        {
-            "principle_name": "Data Security",
-            "principle_explanation": "Implement appropriate technical and organizational measures to protect data.",
-            "policy_analysis": {
-                "summary": "The policy makes a general statement about 'industry standard' security.",
-                "relevant_excerpts": [
-                    {"excerpt": "Our security is industry standard.", "location_context": "Section 4"}
-                ]
-            },
-            "compliance_assessment": {
-                "level": "Low",
-                "justification": "'Industry standard' is vague and provides no concrete information on security measures.",
-                "suggestions": ["Detail specific security measures (e.g., encryption, access controls).", "Mention security certifications or audits if applicable."]
-            }
-        },
-        {
-            "principle_name": "Transparency",
-            "principle_explanation": "Be clear and open with individuals about how their personal data is collected, used, and shared.",
-            "policy_analysis": {
-                "summary": "The policy is very brief and lacks detailed information on data usage and sharing.",
-                "relevant_excerpts": []
-            },
-            "compliance_assessment": {
-                "level": "Low",
-                "justification": "Insufficient detail on data processing activities. Does not clearly state all purposes or sharing practices.",
-                "suggestions": ["Provide a comprehensive list of data uses.", "Clearly list any third-party sharing.", "Explain user rights more thoroughly."]
-            }
-        }
-    ]
-
-    # Convert dicts to Pydantic models
-    assessment_results = []
-    for item in assessment_results_data:
-        policy_analysis = PolicyAnalysisResult(**item["policy_analysis"])
-        compliance_assessment = ComplianceAssessmentResult(**item["compliance_assessment"])
-        assessment_results.append(AssessmentResult(
-            principle_name=item["principle_name"],
-            principle_explanation=item["principle_explanation"],
-            policy_analysis=policy_analysis,
-            compliance_assessment=compliance_assessment
-        ))
-
-    print(f"Generating report for {len(assessment_results)} principles...")
-    report = report_agent.invoke(policy_text=sample_policy_text, assessment_results=assessment_results)
+    logger.debug("Generating report for %s principles...", len(assessment_results))
+    report = report_agent.invoke(policy_text=SAMPLE_POLICY_TEXT, assessment_results=list(assessment_results))
 
     assert report is not None, "Report generation failed, returned None."
     assert isinstance(report, str), f"Report should be a string, but got {type(report)}"
     assert len(report.strip()) > 0, "Generated report is empty."
-    print("ReportGenerator generated report successfully.")
-    print("\n--- Generated Report (Snippet) ---")
-    print(report[:1000] + "..." if len(report) > 1000 else report) # Print a snippet
-    print("\n--- Test complete for ReportGenerator ---")
+    logger.debug("ReportGenerator generated report successfully.")
+    logger.debug("--- Generated Report (Snippet) ---")
+    logger.debug("%.1000s", report) # Log a snippet
+    logger.debug("--- Test complete for ReportGenerator ---")
+
+
+@pytest.mark.integration
+def test_report_generator_agent_ainvoke_stream(gemini_api_key, assessment_results):
+    """
+    Tests that ainvoke_stream delivers the report incrementally, as a series of text chunks.
+    """
+    if not gemini_api_key:
+        pytest.skip("GEMINI_API_KEY not found, skipping ReportGeneratorAgent integration test.")
+    import asyncio
+
+    report_agent = ReportGeneratorAgent()
+
+    async def collect():
+        chunks = []
+        async for chunk in report_agent.ainvoke_stream(SAMPLE_POLICY_TEXT, list(assessment_results), force_refresh=True):
+            logger.debug("Report chunk %d: %s", len(chunks), chunk)
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(collect())
+
+    assert chunks, "Report streaming yielded no chunks."
+    assert all(isinstance(chunk, str) and chunk for chunk in chunks)
+    assert len("".join(chunks).strip()) > 0, "Generated report is empty."
+
+
+def test_report_generator_agent_invoke_with_mock(monkeypatch, tmp_path, mock_gemini, assessment_results):
+    """
+    Unit counterpart of test_report_generator_agent_invoke: the report comes from a mock Gemini.
+    """
+    mock_gemini.text = "# Privacy Report\n\nData Minimization: Medium"
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    report_agent = ReportGeneratorAgent()
+    object.__setattr__(report_agent, "_get_llm_client", lambda cached_content=None: mock_gemini)
+
+    report = report_agent.invoke(policy_text=SAMPLE_POLICY_TEXT, assessment_results=list(assessment_results))
+
+    assert report == mock_gemini.text
+    assert len(mock_gemini.prompts) == 1
+    assert SAMPLE_POLICY_TEXT in mock_gemini.prompts[0]
+    assert all(result.principle_name in mock_gemini.prompts[0] for result in assessment_results)
+
+
+def test_report_generator_agent_invoke_stream(monkeypatch, tmp_path, mock_gemini):
+    """
+    Tests that invoke_stream yields the LLM's chunks and caches the joined report.
+    """
+    mock_gemini.chunks = ["# Report\n", "", "All good."]
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    report_agent = ReportGeneratorAgent()
+    object.__setattr__(report_agent, "_get_llm_client", lambda cached_content=None: mock_gemini)
+    results = [{"principle_name": "Data Minimization", "principle_explanation": "Collect only what is needed."}]
+
+    assert list(report_agent.invoke_stream("Policy text", results)) == ["# Report\n", "All good."]
+    assert list(report_agent.invoke_stream("Policy text", results)) == ["# Report\nAll good."]
+    assert len(mock_gemini.prompts) == 1
+    assert list(report_agent.invoke_stream("Policy text", [])) == []
+
+
+def test_report_generator_agent_ainvoke_stream_with_mock(monkeypatch, tmp_path, mock_gemini):
+    """
+    Tests that ainvoke_stream yields the chunks of the async streaming response.
+    """
+    import asyncio
+
+    mock_gemini.chunks = ["# Report\n", "All good."]
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    report_agent = ReportGeneratorAgent()
+    object.__setattr__(report_agent, "_get_llm_client", lambda cached_content=None: mock_gemini)
+    results = [{"principle_name": "Data Minimization", "principle_explanation": "Collect only what is needed."}]
+
+    async def collect():
+        return [chunk async for chunk in report_agent.ainvoke_stream("Policy text", results)]
+
+    assert asyncio.run(collect()) == ["# Report\n", "All good."]
+    assert len(mock_gemini.prompts) == 1
+
+
+def test_report_generator_agent_streams_retry_opening_errors(monkeypatch, tmp_path, mock_gemini):
+    """
+    Tests that a transient error when opening the stream is retried, in both invoke_stream and ainvoke_stream.
+    """
+    import asyncio
+
+    from google.api_core import exceptions
+    from tenacity import wait_none
+
+    from privacy_agent.agents import report_generator_agent
+
+    class FlakyGemini:
+        """Raises ServiceUnavailable on the first request of each kind, then defers to mock_gemini."""
+
+        def __init__(self):
+            self.failed = set()
+
+        def _fail_once(self, kind):
+            if kind not in self.failed:
+                self.failed.add(kind)
+                raise exceptions.ServiceUnavailable("overloaded")
+
+        def generate_content(self, prompt, **kwargs):
+            self._fail_once("sync")
+            return mock_gemini.generate_content(prompt, **kwargs)
+
+        async def generate_content_async(self, prompt, **kwargs):
+            self._fail_once("async")
+            return await mock_gemini.generate_content_async(prompt, **kwargs)
+
+    monkeypatch.setattr(report_generator_agent, "call_llm", report_generator_agent.call_llm.retry_with(wait=wait_none()))
+    monkeypatch.setattr(report_generator_agent, "acall_llm", report_generator_agent.acall_llm.retry_with(wait=wait_none()))
+    mock_gemini.chunks = ["# Report\n", "All good."]
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    report_agent = ReportGeneratorAgent()
+    flaky = FlakyGemini()
+    object.__setattr__(report_agent, "_get_llm_client", lambda cached_content=None: flaky)
+    results = [{"principle_name": "Data Minimization", "principle_explanation": "Collect only what is needed."}]
+
+    async def collect():
+        return [chunk async for chunk in report_agent.ainvoke_stream("Policy text", results, force_refresh=True)]
+
+    assert list(report_agent.invoke_stream("Policy text", results, force_refresh=True)) == ["# Report\n", "All good."]
+    assert asyncio.run(collect()) == ["# Report\n", "All good."]
+    assert flaky.failed == {"sync", "async"}
+    assert len(mock_gemini.prompts) == 2
+
+def test_report_generator_dict_results_keep_compliance_fields():
+    """
+    Regression test: dict assessment results must keep their compliance level,
+    justification and suggestions instead of being reported as N/A.
+    """
+    report_agent = ReportGeneratorAgent()
+    result = AssessmentResult(
+        principle_name="Data Minimization",
+        principle_explanation="Collect only what is needed.",
+        policy_analysis=PolicyAnalysisResult(summary="Mentions minimal collection."),
+        compliance_assessment=ComplianceAssessmentResult(
+            level="High",
+            justification="Explicitly limits collection.",
+            suggestions=["List each data field's purpose."],
+        ),
+    )
+
+    prompt_from_dict = report_agent._build_input_prompt("Policy text", [result.to_dict()])
+    assert "**Compliance Level:** High" in prompt_from_dict
+    assert "**Justification:** Explicitly limits collection." in prompt_from_dict
+    assert "  - List each data field's purpose." in prompt_from_dict
+    assert prompt_from_dict == report_agent._build_input_prompt("Policy text", [result])
+
+
+def test_report_generator_cached_content_omits_policy_text(monkeypatch, tmp_path, mock_gemini):
+    """
+    With a cached content handle, the policy text is not re-sent in the prompt.
+    """
+    import google.generativeai as genai
+
+    mock_gemini.text = "# Report"
+    monkeypatch.setenv("PRIVACY_AGENT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(genai.GenerativeModel, "from_cached_content", classmethod(lambda cls, cached: mock_gemini))
+    report_agent = ReportGeneratorAgent()
+    results = [{"principle_name": "Data Minimization", "principle_explanation": "Collect only what is needed."}]
+
+    assert report_agent.invoke("Policy text", results, cached_content=object()) == "# Report"
+    assert "BEGIN POLICY TEXT" not in mock_gemini.prompts[0]
+    assert "Data Minimization" in mock_gemini.prompts[0]
+    # The report is cached under the full input, so it is reused without the handle
+    assert report_agent.invoke("Policy text", results) == "# Report"
+    assert len(mock_gemini.prompts) == 1
+
 
 # Example of how to run this test file using pytest:
 # In your terminal, navigate to the root of your project (where pyproject.toml is)
@@ -0,0 +1,65 @@
+import pytest
+
+from privacy_agent._env import get_api_key
+
+
+class MockGemini:
+    """
+    Stands in for the google.generativeai GenerativeModel an agent calls,
+    answering every prompt with `text`.
+
+    Install it with agent._client = mock_gemini; the prompts it received are
+    kept in `prompts`.
+    """
+
+    model_name = "models/mock-gemini"
+
+    def __init__(self, text: str = "Mock explanation.", chunks=None):
+        self.text = text
+        # Streamed responses yield these texts (default: `text` as a single chunk)
+        self.chunks = chunks
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        if stream:
+            chunks = [self.text] if self.chunks is None else self.chunks
+            return [MockGeminiResponse(chunk) for chunk in chunks]
+        return MockGeminiResponse(self.text)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        response = self.generate_content(prompt, stream=stream, **kwargs)
+        if not stream:
+            return response
+
+        async def stream_chunks():
+            for chunk in response:
+                yield chunk
+
+        return stream_chunks()
+
+
+class MockGeminiResponse:
+    """The part of a generate_content response the agents read."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class MockContext:
+    """Stands in for the ADK invocation context, which hands an agent its inputs in `state`."""
+
+    def __init__(self, **state):
+        self.state = state
+
+
+@pytest.fixture(scope="session")
+def gemini_api_key():
+    """The Gemini API key, read once per session from the environment or .env (None if unset)."""
+    return get_api_key()
+
+
+@pytest.fixture
+def mock_gemini():
+    """A MockGemini for unit tests that must not reach the Gemini API."""
+    return MockGemini()
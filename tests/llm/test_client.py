@@ -0,0 +1,30 @@
+import inspect
+
+import google.generativeai as genai
+import pytest
+
+from privacy_agent.agents.compliance_assessor_agent import ComplianceAssessorAgent
+from privacy_agent.agents.policy_analyzer_agent import PolicyAnalyzerAgent
+from privacy_agent.agents.regulation_understanding_agent import RegulationUnderstandingAgent
+from privacy_agent.llm.client import get_gemini, get_generative_model
+
+
+@pytest.mark.parametrize("agent_class", [PolicyAnalyzerAgent, RegulationUnderstandingAgent, ComplianceAssessorAgent])
+def test_agents_call_a_generative_model(agent_class):
+    """The agents call a shared GenerativeModel, whose methods accept a text prompt and generation_config."""
+    agent = agent_class(model_name="gemini-2.0-flash")
+
+    assert isinstance(agent._client, genai.GenerativeModel)
+    assert agent._client is get_generative_model("gemini-2.0-flash")
+    assert agent._client.model_name == "models/gemini-2.0-flash"
+    for method in (agent._client.generate_content, agent._client.generate_content_async):
+        assert "generation_config" in inspect.signature(method).parameters
+
+
+def test_get_gemini_uses_the_requested_model():
+    """Each model name gets its own shared ADK Gemini, configured for that model."""
+    flash = get_gemini("gemini-2.0-flash")
+
+    assert flash.model == "gemini-2.0-flash"
+    assert get_gemini("gemini-2.0-flash") is flash
+    assert get_gemini("gemini-1.5-pro").model == "gemini-1.5-pro"
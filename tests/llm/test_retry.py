@@ -0,0 +1,38 @@
+from unittest.mock import Mock
+
+import pytest
+from google.api_core import exceptions
+from tenacity import wait_none
+
+from privacy_agent.llm.retry import MAX_ATTEMPTS, call_llm
+
+# Same retry policy without the backoff sleeps
+call_llm_now = call_llm.retry_with(wait=wait_none())
+
+
+def test_call_llm_retries_transient_errors():
+    """A rate-limited call is retried and the eventual response returned."""
+    client = Mock()
+    client.generate_content.side_effect = [exceptions.ResourceExhausted("quota"), "response"]
+
+    assert call_llm_now(client, "prompt", generation_config={}) == "response"
+    assert client.generate_content.call_count == 2
+    client.generate_content.assert_called_with("prompt", generation_config={})
+
+
+def test_call_llm_gives_up_after_max_attempts():
+    client = Mock()
+    client.generate_content.side_effect = exceptions.ServiceUnavailable("overloaded")
+
+    with pytest.raises(exceptions.ServiceUnavailable):
+        call_llm_now(client, "prompt")
+    assert client.generate_content.call_count == MAX_ATTEMPTS
+
+
+def test_call_llm_does_not_retry_other_errors():
+    client = Mock()
+    client.generate_content.side_effect = exceptions.InvalidArgument("bad request")
+
+    with pytest.raises(exceptions.InvalidArgument):
+        call_llm_now(client, "prompt")
+    assert client.generate_content.call_count == 1
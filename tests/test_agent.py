@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from privacy_agent.agent import PrivacyAssessmentAgent
+
+
+def test_analyze_url_prefetches_explanations_during_fetch():
+    """Principle explanations are requested before the policy fetch completes."""
+    agent = PrivacyAssessmentAgent()
+    events = []
+
+    async def fake_explain(principle):
+        events.append(("explain", principle))
+        return f"{principle} explained"
+
+    async def fake_fetch(urls):
+        await asyncio.sleep(0)  # let the explanation requests start
+        events.append(("fetched", urls[0]))
+        return [{"url": urls[0], "extracted_text": "We collect email addresses."}]
+
+    async def fake_analyze(policy_text, principles, principle_explanations=None):
+        return [{"summary": f"{p}: {e}", "relevant_excerpts": []} for p, e in zip(principles, principle_explanations)]
+
+    object.__setattr__(agent.find_sub_agent("RegulationUnderstander"), "ainvoke", fake_explain)
+    object.__setattr__(agent.find_sub_agent("PolicyFetcher"), "ainvoke", fake_fetch)
+    object.__setattr__(agent.find_sub_agent("PolicyAnalyzer"), "ainvoke_many", fake_analyze)
+
+    results = asyncio.run(agent.analyze_url("https://example.com/privacy", ["Transparency", "Consent"]))
+
+    assert events.index(("fetched", "https://example.com/privacy")) > events.index(("explain", "Transparency"))
+    assert [r.principle_name for r in results] == ["Transparency", "Consent"]
+    assert results[1].principle_explanation == "Consent explained"
+    assert results[1].policy_analysis.summary == "Consent: Consent explained"
+
+
+def test_analyze_url_cancels_explanations_when_fetch_fails():
+    """Outstanding explanation requests are cancelled when the fetch errors or raises."""
+    agent = PrivacyAssessmentAgent()
+    cancelled = []
+
+    async def slow_explain(principle):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(principle)
+            raise
+
+    async def failed_fetch(urls):
+        await asyncio.sleep(0)  # let the explanation requests start
+        return [{"url": urls[0], "error": "HTTP 404"}]
+
+    async def raising_fetch(urls):
+        await asyncio.sleep(0)
+        raise RuntimeError("connection reset")
+
+    object.__setattr__(agent.find_sub_agent("RegulationUnderstander"), "ainvoke", slow_explain)
+    fetcher = agent.find_sub_agent("PolicyFetcher")
+
+    async def run():
+        object.__setattr__(fetcher, "ainvoke", failed_fetch)
+        result = await agent.analyze_url("https://example.com/privacy", ["Transparency"])
+        await asyncio.sleep(0)  # let the cancellation reach the explanation request
+        assert result == {"url": "https://example.com/privacy", "error": "HTTP 404"}
+
+        object.__setattr__(fetcher, "ainvoke", raising_fetch)
+        with pytest.raises(RuntimeError):
+            await agent.analyze_url("https://example.com/privacy", ["Consent"])
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == ["Transparency", "Consent"]
+
+
+def test_analyze_url_drops_failed_explanations():
+    """An "Error: ..." explanation is not passed to the analyzer or reported as the explanation."""
+    agent = PrivacyAssessmentAgent()
+    received = []
+
+    async def fake_explain(principle):
+        return "Error: quota exceeded" if principle == "Consent" else f"{principle} explained"
+
+    async def fake_fetch(urls):
+        return [{"url": urls[0], "extracted_text": "We collect email addresses."}]
+
+    async def fake_analyze(policy_text, principles, principle_explanations=None):
+        received.extend(principle_explanations)
+        return [{"summary": p, "relevant_excerpts": []} for p in principles]
+
+    object.__setattr__(agent.find_sub_agent("RegulationUnderstander"), "ainvoke", fake_explain)
+    object.__setattr__(agent.find_sub_agent("PolicyFetcher"), "ainvoke", fake_fetch)
+    object.__setattr__(agent.find_sub_agent("PolicyAnalyzer"), "ainvoke_many", fake_analyze)
+
+    results = asyncio.run(agent.analyze_url("https://example.com/privacy", ["Transparency", "Consent"]))
+
+    assert received == ["Transparency explained", ""]
+    assert results[0].additional_details == {}
+    assert results[1].principle_explanation == ""
+    assert results[1].additional_details == {"explanation_error": "Error: quota exceeded"}
+    assert results[1].policy_analysis.summary == "Consent"
@@ -0,0 +1,40 @@
+import dataclasses
+import json
+
+from privacy_agent import data_structures
+from privacy_agent.data_structures import AssessmentResult, ComplianceAssessmentResult, PolicyAnalysisResult
+
+
+def test_to_json_matches_to_dict(monkeypatch):
+    """to_json encodes exactly to_dict(), with or without orjson."""
+    result = AssessmentResult(
+        principle_name="Data Minimization",
+        principle_explanation="Collect only what is needed — nothing more.",
+        policy_analysis=PolicyAnalysisResult(summary="Mentions minimal collection."),
+    )
+
+    assert json.loads(result.to_json()) == result.to_dict()
+    assert result.to_dict()["compliance_assessment"] == {}
+    monkeypatch.setattr(data_structures, "orjson", None)
+    assert json.loads(result.to_json()) == result.to_dict()
+
+
+def test_to_dict_matches_asdict():
+    """to_dict returns deep copies, like dataclasses.asdict."""
+    result = AssessmentResult(
+        principle_name="Transparency",
+        principle_explanation="Tell users what is collected.",
+        policy_analysis=PolicyAnalysisResult(
+            summary="Lists collected data.",
+            relevant_excerpts=[{"excerpt": "We collect email.", "location_context": "Section 1"}],
+        ),
+        compliance_assessment=ComplianceAssessmentResult(level="Compliant", justification="Clear.", suggestions=["None"]),
+        additional_details={"source": {"url": "https://example.com"}},
+    )
+
+    as_dict = result.to_dict()
+    assert as_dict == dataclasses.asdict(result)
+    as_dict["policy_analysis"]["relevant_excerpts"][0]["excerpt"] = "changed"
+    as_dict["compliance_assessment"]["suggestions"].append("changed")
+    as_dict["additional_details"]["source"]["url"] = "changed"
+    assert result.to_dict() == dataclasses.asdict(result) != as_dict
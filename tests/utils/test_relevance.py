@@ -0,0 +1,55 @@
+from privacy_agent.utils.relevance import select_relevant_sections
+from privacy_agent.utils.web_parser import extract_text_from_html
+
+FILLER = "We may update this policy from time to time and will post changes on this page. " * 8
+
+LONG_POLICY = "\n\n".join([
+    "1. Data Collection\nWe collect your email address and name when you create an account.",
+    FILLER,
+    "2. Data Retention\nWe retain personal data only as long as needed, then delete it.",
+    FILLER,
+    "3. Data Security\nWe encrypt personal data in transit and at rest.",
+    FILLER,
+    "4. Data Retention for Backups\nBackups that contain personal data are deleted after 90 days.",
+])
+
+def test_select_relevant_sections_keeps_matching_sections_in_order():
+    """Only sections matching the principle are kept, in their original order."""
+    result = select_relevant_sections(LONG_POLICY, "Data Retention", max_chars=200)
+    assert result == (
+        "2. Data Retention\nWe retain personal data only as long as needed, then delete it.\n\n"
+        "4. Data Retention for Backups\nBackups that contain personal data are deleted after 90 days."
+    )
+
+def test_select_relevant_sections_falls_back_to_full_text():
+    """Short policies, unmatched queries and single-section matches return the full text."""
+    assert select_relevant_sections("Short policy.", "Data Retention") == "Short policy."
+    assert select_relevant_sections(LONG_POLICY, "Children", max_chars=200) == LONG_POLICY
+    assert select_relevant_sections(LONG_POLICY, "encrypt", max_chars=200) == LONG_POLICY
+
+def test_select_relevant_sections_splits_extracted_html_at_headings():
+    """Text extracted from HTML has no blank lines; its headings still delimit the sections."""
+    filler = f"<h2>Changes to This Policy</h2>\n<p>{FILLER}</p>"
+    html = f"""<html><body>
+      <h1>Privacy Policy</h1>
+      <h2>Data Collection</h2>
+      <p>We collect your email address and name
+         when you create an account.</p>
+      {filler}
+      <h2>Data Retention</h2>
+      <p>We retain personal data only as long as needed, then delete it.</p>
+      {filler}
+      <h2>Data Security</h2>
+      <p>We encrypt personal data in transit and at rest.</p>
+      {filler}
+      <h2>Retention of Backups</h2>
+      <p>Backups that contain personal data are deleted after 90 days.</p>
+    </body></html>"""
+    policy_text = extract_text_from_html(html)
+    assert "\n\n" not in policy_text
+
+    result = select_relevant_sections(policy_text, "retention of backups", max_chars=300)
+    assert result == (
+        "Data Retention\nWe retain personal data only as long as needed, then delete it.\n\n"
+        "Retention of Backups\nBackups that contain personal data are deleted after 90 days."
+    )
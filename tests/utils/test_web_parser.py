@@ -0,0 +1,154 @@
+from privacy_agent.utils import web_parser
+from privacy_agent.utils.web_parser import extract_text_from_html, fetch_url_content
+
+SAMPLE_HTML = """
+<html><head><style>p { color: red; }</style><script>var tracking = 1;</script></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About</a></nav>
+  <h1>Privacy Policy</h1>
+  <p>We collect your email address.</p>
+  <footer>Copyright 2024 Example Inc.</footer>
+</body></html>
+"""
+
+def test_extract_text_from_html_drops_non_content_elements():
+    """Script, style, navigation and footer text is not part of the extracted policy."""
+    assert extract_text_from_html(SAMPLE_HTML) == "Privacy Policy\nWe collect your email address."
+
+def test_extract_text_from_html_empty():
+    """Empty input yields empty text."""
+    assert extract_text_from_html("") == ""
+
+def test_fetch_url_content_revalidates_with_etag(monkeypatch, tmp_path):
+    """A second fetch sends the stored ETag and reuses the cached page on 304 Not Modified."""
+    class MockResponse:
+        def __init__(self, status_code, text="", headers=None):
+            self.status_code = status_code
+            self.text = text
+            self.headers = headers or {}
+
+        def raise_for_status(self):
+            pass
+
+    sent_headers = []
+
+    def mock_get(url, headers, timeout):
+        sent_headers.append(dict(headers))
+        if headers.get("If-None-Match") == '"v1"':
+            return MockResponse(304)
+        return MockResponse(200, SAMPLE_HTML, {"ETag": '"v1"'})
+
+    monkeypatch.setenv("PRIVACY_AGENT_POLICY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(web_parser._session, "get", mock_get)
+    monkeypatch.setattr(web_parser, "POLICY_FRESHNESS", 0)  # always revalidate
+    url = "https://example.com/privacy"
+
+    assert fetch_url_content(url) == SAMPLE_HTML
+    assert "If-None-Match" not in sent_headers[0]
+    assert fetch_url_content(url) == SAMPLE_HTML
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+
+def test_fetch_and_extract_parses_streamed_body(monkeypatch, tmp_path):
+    """The streamed body is parsed into the same text extract_text_from_html returns, and cached by ETag."""
+    class MockStreamedResponse:
+        def __init__(self, status_code, body=b"", headers=None):
+            self.status_code = status_code
+            self.body = body
+            self.headers = headers or {}
+            self.encoding = "utf-8"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            for start in range(0, len(self.body), 16):  # small chunks split tags mid-way
+                yield self.body[start:start + 16]
+
+    def mock_get(url, headers, timeout, stream):
+        assert stream
+        if headers.get("If-None-Match") == '"v1"':
+            return MockStreamedResponse(304)
+        return MockStreamedResponse(200, SAMPLE_HTML.encode("utf-8"), {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+    monkeypatch.setenv("PRIVACY_AGENT_POLICY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(web_parser._session, "get", mock_get)
+    monkeypatch.setattr(web_parser, "POLICY_FRESHNESS", 0)  # always revalidate
+    url = "https://example.com/privacy"
+
+    assert web_parser.fetch_and_extract(url) == extract_text_from_html(SAMPLE_HTML)
+    assert web_parser.fetch_and_extract(url) == "Privacy Policy\nWe collect your email address."
+
+def test_fetch_urls_keeps_input_order(monkeypatch):
+    """fetch_urls returns one result per URL, in order, with None for failures."""
+    pages = {"https://a.example/privacy": "<p>A</p>", "https://b.example/privacy": "<p>B</p>"}
+    monkeypatch.setattr(web_parser, "fetch_url_content", pages.get)
+
+    urls = ["https://b.example/privacy", "https://missing.example/privacy", "https://a.example/privacy"]
+    assert web_parser.fetch_urls(urls) == ["<p>B</p>", None, "<p>A</p>"]
+    assert web_parser.fetch_urls([]) == []
+
+def test_fetch_url_content_reuses_fresh_page_without_request(monkeypatch, tmp_path):
+    """A page fetched within POLICY_FRESHNESS is served from the cache, even without validators."""
+    class MockResponse:
+        status_code = 200
+        text = SAMPLE_HTML
+        headers = {}
+
+        def raise_for_status(self):
+            pass
+
+    requested = []
+
+    def mock_get(url, headers, timeout):
+        requested.append(url)
+        return MockResponse()
+
+    monkeypatch.setenv("PRIVACY_AGENT_POLICY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(web_parser._session, "get", mock_get)
+    url = "https://example.com/privacy"
+
+    assert fetch_url_content(url) == SAMPLE_HTML
+    assert fetch_url_content(url) == SAMPLE_HTML
+    assert requested == [url]
+
+def test_extract_text_from_html_keeps_text_around_removed_scripts():
+    """Text following a removed script or style block is kept."""
+    html = '<body>Before<script type="text/javascript">if (a < b) {}</script> after<STYLE>p {}</style>end</body>'
+    assert extract_text_from_html(html) == "Before afterend"
+
+def test_fetch_and_extract_skips_non_html_responses(monkeypatch, tmp_path):
+    """Non-HTML and oversized responses give empty text without being read or parsed."""
+    class MockStreamedResponse:
+        status_code = 200
+        encoding = None
+
+        def __init__(self, headers):
+            self.headers = headers
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            raise AssertionError("body should not be read")
+
+    responses = {
+        "https://example.com/policy.pdf": {"Content-Type": "application/pdf"},
+        "https://example.com/huge": {"Content-Type": "text/html", "Content-Length": str(web_parser.MAX_PAGE_BYTES + 1)},
+    }
+    monkeypatch.setenv("PRIVACY_AGENT_POLICY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(web_parser._session, "get", lambda url, **kwargs: MockStreamedResponse(responses[url]))
+
+    assert web_parser.fetch_and_extract("https://example.com/policy.pdf") == ""
+    assert web_parser.fetch_and_extract("https://example.com/huge") == ""